@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """A simple script to paginate a dataset of popular baby names.
 """
-import csv
-from typing import List, Tuple
+import threading
+from typing import List, Sequence, Tuple
+
+from csv_tail import GrowingDataset
+from parallel_csv import load
+from sidecar import Sidecar
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -17,29 +21,77 @@ class Server:
     """class to handle pagination of dataset of popular baby names.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
+    STORAGES = ("list", "mmap", "columnar")
 
-    def __init__(self):
+    def __init__(self, storage: str = "list", workers: int = 1,
+                 watch: float = None):
         """Initialize an instance of the Server class.
+
+        Args:
+            storage (str): "list" parses the whole file on first use,
+                "mmap" maps it and indexes where its rows start, the
+                rows of a page being parsed when the page is served,
+                "columnar" keeps the parsed fields in compact columns
+                and builds the rows of a page when it is served.
+                Both keep what they compute in a sidecar.Sidecar file
+                next to the CSV file, reused while it is unchanged and
+                mapped once for all the Servers of a process and the
+                processes forked from it.
+            workers (int): number of processes parsing the CSV file
+                when it is loaded or its sidecar built, see
+                parallel_csv.load; None for one per CPU.
+            watch (float): with the list storage, seconds between two
+                checks of the CSV file for appended rows, added then to
+                the dataset, see reload; None for no checks.
         """
+        if storage not in self.STORAGES:
+            raise ValueError("storage must be one of {}".format(
+                ", ".join(self.STORAGES)))
+        if watch is not None and storage != "list":
+            raise ValueError("only the list storage can watch the file")
+        self.storage = storage
+        self.workers = workers
+        self.watch = watch
         self.__dataset = None
+        self.__growing = None
+        self.__lock = threading.RLock()
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Load and cache the dataset from the CSV file.
         """
+        if self.__growing is not None and self.__growing.due():
+            self.reload()
+        if self.__dataset is None and self.watch is not None:
+            with self.__lock:
+                if self.__growing is None:
+                    self.__growing = GrowingDataset(
+                        self.DATA_FILE, 1, self.workers, self.watch)
+                    self.__dataset = self.__growing.snapshot
+        if self.__dataset is None and self.storage == "mmap":
+            self.__dataset = Sidecar.attach(self.DATA_FILE,
+                                            workers=self.workers).index()
+        if self.__dataset is None and self.storage == "columnar":
+            self.__dataset = Sidecar.attach(self.DATA_FILE,
+                                            workers=self.workers).columnar()
         if self.__dataset is None:
-            self.__dataset = []
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                row = next(reader)  # Skip header row
-                while True:
-                    try:
-                        row = next(reader)
-                        self.__dataset.append(row)
-                    except StopIteration:
-                        break
+            self.__dataset = load(self.DATA_FILE, 1, self.workers)
 
         return self.__dataset
 
+    def reload(self) -> int:
+        """Add the rows appended to the CSV file since it was read to
+        the dataset in place, return how many. Readers keep the
+        snapshot of the dataset they got, which never changes.
+        """
+        if self.watch is None:
+            raise ValueError("reload needs a Server watching the file")
+        if self.__growing is None:
+            self.dataset()
+        with self.__lock:
+            added = self.__growing.reload()
+            self.__dataset = self.__growing.snapshot
+        return added
+
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """Retrieve a page of data from the dataset.
         """
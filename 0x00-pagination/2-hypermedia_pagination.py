@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
 """This script implements a pagination system for a dataset.
 """
+import bz2
 import csv
+import gzip
+import io
+import json
+import lzma
 import math
-from typing import Dict, List, Tuple
+import threading
+from typing import BinaryIO, Dict, Iterator, List, Sequence, Tuple
+
+from csv_tail import GrowingDataset
+from name_search import NameSearch
+from parallel_csv import load
+from secondary_index import TableIndex
+from sidecar import Sidecar
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -18,27 +30,91 @@ class Server:
     """Server class to handle pagination of a baby names dataset.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
+    STORAGES = ("list", "mmap", "columnar")
+    FORMATS = ("ndjson", "csv")
+    COMPRESSIONS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
 
-    def __init__(self):
+    def __init__(self, storage: str = "list", workers: int = 1,
+                 watch: float = None):
         """Initialize the Server instance with an empty dataset.
+
+        Args:
+            storage (str): "list" parses the whole file on first use,
+                "mmap" maps it and indexes where its rows start, the
+                rows of a page being parsed when the page is served,
+                "columnar" keeps the parsed fields in compact columns
+                and builds the rows of a page when it is served.
+                Both keep what they compute in a sidecar.Sidecar file
+                next to the CSV file, reused while it is unchanged and
+                mapped once for all the Servers of a process and the
+                processes forked from it.
+            workers (int): number of processes parsing the CSV file
+                when it is loaded or its sidecar built, see
+                parallel_csv.load; None for one per CPU.
+            watch (float): with the list storage, seconds between two
+                checks of the CSV file for appended rows, added then to
+                the dataset and its indexes, see reload; None for no
+                checks.
         """
+        if storage not in self.STORAGES:
+            raise ValueError("storage must be one of {}".format(
+                ", ".join(self.STORAGES)))
+        if watch is not None and storage != "list":
+            raise ValueError("only the list storage can watch the file")
+        self.storage = storage
+        self.workers = workers
+        self.watch = watch
         self.__dataset = None
+        self.__growing = None
+        self.__table_index = None
+        self.__name_search = None
+        self.__lock = threading.RLock()
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Load and cache the dataset from the CSV file.
         """
+        if self.__growing is not None and self.__growing.due():
+            self.reload()
+        if self.__dataset is None and self.watch is not None:
+            with self.__lock:
+                if self.__growing is None:
+                    self.__growing = GrowingDataset(
+                        self.DATA_FILE, 0, self.workers, self.watch)
+                    self.__dataset = self.__growing.snapshot
+        if self.__dataset is None and self.storage == "mmap":
+            # same rows as the list storage, which keeps the header
+            self.__dataset = Sidecar.attach(self.DATA_FILE, 0,
+                                            self.workers).index()
+        if self.__dataset is None and self.storage == "columnar":
+            self.__dataset = Sidecar.attach(self.DATA_FILE, 0,
+                                            self.workers).columnar()
         if self.__dataset is None:
-            dataset = []
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                row = next(reader, None)  # Skip the header row
-                while row:
-                    dataset.append(row)
-                    row = next(reader, None)
-            self.__dataset = dataset
+            self.__dataset = load(self.DATA_FILE, 0, self.workers)
 
         return self.__dataset
 
+    def reload(self) -> int:
+        """Add the rows appended to the CSV file since it was read to
+        the dataset, then to its indexes, in place; return how many.
+
+        Readers keep the snapshot of the dataset they got: the rows it
+        holds and its length never change. The rows are published
+        before the indexes find them.
+        """
+        if self.watch is None:
+            raise ValueError("reload needs a Server watching the file")
+        if self.__growing is None:
+            self.dataset()
+        with self.__lock:
+            added = self.__growing.reload()
+            if added:
+                self.__dataset = self.__growing.snapshot
+                if self.__table_index is not None:
+                    self.__table_index.extend(self.__dataset)
+                if self.__name_search is not None:
+                    self.__name_search = self.__name_search.refresh()
+        return added
+
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """Retrieve a specific page of data from the dataset.
         """
@@ -48,25 +124,148 @@ class Server:
         data = self.dataset()
         if start > len(data):
             return []
-        page_data = []
-        i = start
-        while i < end and i < len(data):
-            page_data.append(data[i])
-            i += 1
-        return page_data
+        return data[start:end]
 
     def get_hyper(self, page: int = 1, page_size: int = 10) -> Dict:
         """Retrieve hypermedia information for a specific page.
         """
-        page_data = self.get_page(page, page_size)
+        assert type(page) == int and type(page_size) == int
+        assert page > 0 and page_size > 0
+        data = self.dataset()  # one snapshot for the page and totals
         start, end = index_range(page, page_size)
-        total_pages = math.ceil(len(self.__dataset) / page_size)
+        page_data = data[start:end]
+        total_pages = math.ceil(len(data) / page_size)
         page_info = {
             'page_size': len(page_data),
             'page': page,
             'data': page_data,
-            'next_page': page + 1 if end < len(self.__dataset) else None,
+            'next_page': page + 1 if end < len(data) else None,
             'prev_page': page - 1 if start > 0 else None,
             'total_pages': total_pages,
         }
         return page_info
+
+    def iter_pages(self, page_size: int = 10) -> Iterator[List[List]]:
+        """Yield every page of data in order, as get_page would.
+
+        Each page is sliced from the storage when it is reached, so
+        only one page at a time is built by the mmap and columnar
+        storages.
+        """
+        assert type(page_size) == int and page_size > 0
+        data = self.dataset()
+        for start in range(0, len(data), page_size):
+            yield data[start:start + page_size]
+
+    def export(self, file: BinaryIO, fmt: str = "ndjson",
+               compress: str = None, page_size: int = 1000) -> int:
+        """Write the dataset to a binary file object, page by page.
+
+        Args:
+            file (file): where to write, left open.
+            fmt (str): "ndjson" writes one JSON object per row, keyed
+                by the header; "csv" writes the header and the rows.
+            compress (str): None, or one of COMPRESSIONS.
+            page_size (int): rows read from the storage at a time.
+
+        Returns:
+            int: the number of rows written, header excluded.
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError("fmt must be one of {}".format(
+                ", ".join(self.FORMATS)))
+        if compress is not None and compress not in self.COMPRESSIONS:
+            raise ValueError("compress must be None or one of {}".format(
+                ", ".join(self.COMPRESSIONS)))
+        stream = file
+        if compress is not None:
+            stream = self.COMPRESSIONS[compress](file, "wb")
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        header = None
+        count = 0
+        try:
+            for page in self.iter_pages(page_size):
+                if header is None:
+                    # row 0 of the dataset is the header of the CSV file
+                    header, page = page[0], page[1:]
+                    if fmt == "csv":
+                        writer.writerow(header)
+                if fmt == "csv":
+                    writer.writerows(page)
+                else:
+                    text.write("".join(
+                        json.dumps(dict(zip(header, row))) + "\n"
+                        for row in page))
+                count += len(page)
+        finally:
+            text.flush()
+            text.detach()
+            if stream is not file:
+                stream.close()
+        return count
+
+    def table_index(self) -> TableIndex:
+        """Create the secondary indexes of the dataset, whose row 0 is
+        the header of the CSV file.
+        """
+        self.dataset()
+        with self.__lock:
+            if self.__table_index is None:
+                data = self.__dataset
+                self.__table_index = TableIndex(data, data[0], first=1)
+        return self.__table_index
+
+    def get_hyper_filtered(self, filters: Dict[str, str] = None,
+                           sort: str = None, cursor: str = None,
+                           page_size: int = 10) -> Dict:
+        """Retrieve hypermedia information for a page of the rows
+        matching every column = value of filters, sorted by the column
+        sort ("-" first for descending), following a keyset cursor.
+        """
+        assert type(page_size) == int and page_size > 0
+        positions, next_cursor, total = self.table_index().page(
+            filters or {}, sort, cursor, page_size)
+        data = self.dataset()
+        page_data = [data[i] for i in positions]
+        page_info = {
+            'page_size': len(page_data),
+            'cursor': cursor,
+            'data': page_data,
+            'next_cursor': next_cursor,
+            'total_items': total,
+            'total_pages': math.ceil(total / page_size),
+        }
+        return page_info
+
+    def name_search(self) -> NameSearch:
+        """Create the search indexes of the Child's First Name column.
+        """
+        index = self.table_index()
+        with self.__lock:
+            if self.__name_search is None:
+                self.__name_search = NameSearch(index)
+        return self.__name_search
+
+    def search_hyper(self, query: str, mode: str = "prefix",
+                     page: int = 1, page_size: int = 10) -> Dict:
+        """Retrieve hypermedia information for a page of the rows whose
+        first name starts with query, contains it or, for the "fuzzy"
+        mode, resembles it.
+        """
+        assert type(page) == int and type(page_size) == int
+        assert page > 0 and page_size > 0
+        positions, total = self.name_search().page(
+            query, mode, page, page_size)
+        data = self.dataset()
+        page_data = [data[i] for i in positions]
+        start, end = index_range(page, page_size)
+        page_info = {
+            'page_size': len(page_data),
+            'page': page,
+            'data': page_data,
+            'next_page': page + 1 if end < total else None,
+            'prev_page': page - 1 if start > 0 else None,
+            'total_pages': math.ceil(total / page_size),
+        }
+        return page_info
@@ -1,63 +1,73 @@
 #!/usr/bin/env python3
 """Deletion-resilient hypermedia pagination with do-while loops
 """
-import csv
-from typing import Dict, List
+from typing import Dict, List, Sequence
+
+from order_index import IndexedDataset
+from parallel_csv import load
+from sidecar import Sidecar
 
 
 class Server:
     """Server class to paginate a database.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
+    STORAGES = ("list", "mmap", "columnar")
 
-    def __init__(self):
+    def __init__(self, workers: int = 1, storage: str = "list"):
         """Initialize a new Server instance.
+
+        Args:
+            workers (int): number of processes parsing the CSV file,
+                see parallel_csv.load; None for one per CPU.
+            storage (str): "list" parses the whole file in this
+                process; "mmap" and "columnar" attach to the memory
+                mapped sidecar.Sidecar of the file, shared by all the
+                Servers of a process and the processes forked from it.
         """
+        if storage not in self.STORAGES:
+            raise ValueError("storage must be one of {}".format(
+                ", ".join(self.STORAGES)))
+        self.storage = storage
+        self.workers = workers
         self.__dataset = None
         self.__indexed_dataset = None
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Retrieve the cached dataset using a do-while loop.
         """
+        if self.__dataset is None and self.storage == "mmap":
+            self.__dataset = Sidecar.attach(self.DATA_FILE,
+                                            workers=self.workers).index()
+        if self.__dataset is None and self.storage == "columnar":
+            self.__dataset = Sidecar.attach(self.DATA_FILE,
+                                            workers=self.workers).columnar()
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            self.__dataset = load(self.DATA_FILE, 1, self.workers)
 
         return self.__dataset
 
-    def indexed_dataset(self) -> Dict[int, List]:
-        """Create an indexed dataset using a do-while loop.
+    def indexed_dataset(self) -> IndexedDataset:
+        """Create the indexed dataset, a mapping of the row indexes to
+        the rows whose deleted keys pages skip in O(log n). It wraps
+        the dataset without copying it.
         """
         if self.__indexed_dataset is None:
             dataset = self.dataset()
-            truncated_dataset = dataset[:1000]
-            self.__indexed_dataset = {}
-            i = 0
-            while i < len(dataset):
-                self.__indexed_dataset[i] = dataset[i]
-                i += 1
+            self.__indexed_dataset = IndexedDataset(dataset)
         return self.__indexed_dataset
 
     def get_hyper_index(self, index: int = None, page_size: int = 10) -> Dict:
         """Retrieve info about a page from a given index and with a
-        specified size using a do-while loop.
+        specified size, skipping the deleted rows.
         """
         data = self.indexed_dataset()
-        assert index is not None and index >= 0 and index <= max(data.keys())
-        page_data = []
-        data_count = 0
+        assert index is not None and index >= 0 and index <= data.last()
+        page = data.page(index, page_size)
+        page_data = [row for _, row in page]
         next_index = None
-        start = index if index else 0
-        i = start
-        while i < len(data) and data_count < page_size:
-            item = data[i]
-            page_data.append(item)
-            data_count += 1
-            i += 1
-        if data_count == page_size:
-            next_index = i
+        if len(page) == page_size:
+            next_index = page[-1][0] + 1
         page_info = {
             'index': index,
             'next_index': next_index,
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""A Flask app serving the hypermedia pagination APIs over HTTP.
+
+GET /api/v1/hyper?page=1&page_size=10 answers Server.get_hyper of
+2-hypermedia_pagination and GET /api/v1/hyper_index?index=0&page_size=10
+Server.get_hyper_index of 3-hypermedia_del_pagination, as JSON; a
+page_size above MAX_PAGE_SIZE is refused.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+from sidecar import csv_key
+
+Server = __import__('2-hypermedia_pagination').Server
+IndexServer = __import__('3-hypermedia_del_pagination').Server
+
+ROWS_PER_CHUNK = 100
+MAX_PAGE_SIZE = 1000
+
+
+class EncodedPages:
+    """The encoded bytes of the most recently served pages.
+
+    A page is stored under its query, with the ETag it was encoded
+    for; a page found with another ETag is stale and encoded again.
+    The least recently served pages are dropped beyond capacity pages
+    or max_bytes bytes.
+    """
+
+    def __init__(self, capacity: int = 256,
+                 max_bytes: int = 64 << 20) -> None:
+        """Initialize an empty store of up to capacity pages taking up
+        to max_bytes bytes."""
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple, etag: str) -> Optional[bytes]:
+        """The bytes of the page of key encoded for etag, if kept."""
+        with self.lock:
+            entry = self.pages.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self.pages.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Tuple, etag: str, body: bytes) -> None:
+        """Keep the bytes of the page of key encoded for etag."""
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.pages.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old[1])
+            self.pages[key] = (etag, body)
+            self.nbytes += len(body)
+            while (len(self.pages) > self.capacity or
+                   self.nbytes > self.max_bytes):
+                _, (_, dropped) = self.pages.popitem(last=False)
+                self.nbytes -= len(dropped)
+
+
+app = Flask(__name__)
+app.url_map.strict_slashes = False
+server = Server()
+index_server = IndexServer()
+encoded_pages = EncodedPages()
+versions = {}
+
+
+def dataset_version() -> str:
+    """Digest of the content of the CSV file, read once."""
+    if "csv" not in versions:
+        versions["csv"] = csv_key(Server.DATA_FILE)["digest"]
+    return versions["csv"]
+
+
+def encode(page_info: Dict, key: Tuple, etag: str) -> Iterator[bytes]:
+    """Encode a page as json.dumps would, yielding its data array by
+    chunks of rows as they are encoded, then keep the whole encoding.
+    """
+    body = []
+    pending = [b"{"]
+    for i, (name, value) in enumerate(page_info.items()):
+        if i:
+            pending.append(b", ")
+        pending.append(json.dumps(name).encode() + b": ")
+        if name != "data":
+            pending.append(json.dumps(value).encode())
+            continue
+        pending.append(b"[")
+        for start in range(0, len(value), ROWS_PER_CHUNK):
+            rows = json.dumps(value[start:start + ROWS_PER_CHUNK])[1:-1]
+            pending.append((", " + rows if start else rows).encode())
+            chunk = b"".join(pending)
+            body.append(chunk)
+            pending = []
+            yield chunk
+        pending.append(b"]")
+    pending.append(b"}")
+    chunk = b"".join(pending)
+    body.append(chunk)
+    encoded_pages.put(key, etag, b"".join(body))
+    yield chunk
+
+
+def serve(key: Tuple, etag: str, page_info) -> Response:
+    """Answer 304 when the client holds etag, else the kept bytes of
+    the page of key or, the first time, its encoding as it is made.
+
+    Args:
+        key (tuple): the query of the page.
+        etag (str): the ETag of its current content.
+        page_info (callable): builds the page dict and returns it with
+            the ETag of the content it was built from, which may be
+            newer than etag; only called when the page is neither held
+            by the client nor kept.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = encoded_pages.get(key, etag)
+        if body is None:
+            page, etag = page_info()
+            body = encode(page, key, etag)
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+
+def bad_request(message: str) -> Tuple[Response, int]:
+    """A 400 answer telling what is wrong with the query."""
+    return jsonify(error=message), 400
+
+
+@app.route('/api/v1/hyper')
+def get_hyper() -> Response:
+    """A page of the dataset by number."""
+    page = request.args.get('page', 1, type=int)
+    page_size = request.args.get('page_size', 10, type=int)
+    if page < 1 or page_size < 1:
+        return bad_request("page and page_size must be positive integers")
+    if page_size > MAX_PAGE_SIZE:
+        return bad_request("page_size must be at most {}".format(
+            MAX_PAGE_SIZE))
+    key = ("hyper", page, page_size)
+    etag = "{}-{}-{}".format(dataset_version(), page, page_size)
+    return serve(key, etag,
+                 lambda: (server.get_hyper(page, page_size), etag))
+
+
+@app.route('/api/v1/hyper_index')
+def get_hyper_index() -> Response:
+    """A page of the dataset from an index, skipping deleted rows."""
+    index = request.args.get('index', 0, type=int)
+    page_size = request.args.get('page_size', 10, type=int)
+    if index < 0 or page_size < 1:
+        return bad_request("index must be >= 0 and page_size positive")
+    if page_size > MAX_PAGE_SIZE:
+        return bad_request("page_size must be at most {}".format(
+            MAX_PAGE_SIZE))
+    data = index_server.indexed_dataset()
+    if not data or index > data.last():
+        return bad_request("index out of range")
+    key = ("hyper_index", index, page_size)
+
+    def etag_of(version: int) -> str:
+        """The ETag of the page once version changes were made."""
+        return "{}-{}-i{}-{}".format(dataset_version(), version, index,
+                                     page_size)
+
+    def page_info() -> Tuple[Dict, str]:
+        """The page, with the ETag of the version it was built at:
+        no row is deleted meanwhile."""
+        with data.lock:
+            return (index_server.get_hyper_index(index, page_size),
+                    etag_of(data.version))
+
+    return serve(key, etag_of(data.version), page_info)
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000)
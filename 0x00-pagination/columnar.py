@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Columnar, compact in-memory storage of a CSV dataset.
+
+Usage: python3 columnar.py [FILE] prints the memory the whole dataset
+takes as a list of rows, as a csv_index.CSVIndex and as a
+ColumnarDataset.
+"""
+import csv
+import sys
+from array import array
+from itertools import repeat
+from typing import Iterable, List, Sequence, Union
+
+from parallel_csv import load_columns
+
+CODES = ("B", "H", "I", "L")
+UNSIGNED = ("B", "H", "I", "Q")
+SIGNED = ("b", "h", "i", "q")
+
+
+def smallest_typecode(low: int, high: int, typecodes=None) -> str:
+    """Typecode of the smallest array item holding low to high.
+    """
+    if typecodes is None:
+        typecodes = UNSIGNED if low >= 0 else SIGNED
+    for typecode in typecodes:
+        bits = array(typecode).itemsize * 8
+        if typecode in SIGNED:
+            if -(1 << bits - 1) <= low and high < 1 << bits - 1:
+                return typecode
+        elif high < 1 << bits:
+            return typecode
+    raise OverflowError("{} to {} fits no array".format(low, high))
+
+
+class Column:
+    """A column stored as codes into its distinct values.
+
+    Every distinct value is kept once, so a name repeated on many rows
+    costs the size of a code, 1 or 2 bytes for small vocabularies.
+    """
+
+    def __init__(self, values: List[str], codes: Sequence[int]) -> None:
+        """Initialize the column.
+
+        Args:
+            values (list): the distinct values, by code.
+            codes (array): the code of every row, an array or a
+                memoryview of one.
+        """
+        self.values = values
+        self.codes = codes
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.codes)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        """Value of row i, or the list of values of a slice."""
+        if isinstance(i, slice):
+            return list(map(self.values.__getitem__, self.codes[i]))
+        return self.values[self.codes[i]]
+
+    def nbytes(self) -> int:
+        """Bytes taken by the codes and the distinct values."""
+        return (len(self.codes) * self.codes.itemsize +
+                sys.getsizeof(self.values) +
+                sum(map(sys.getsizeof, self.values)))
+
+
+class IntColumn:
+    """A column of integers written in decimal, stored in an array."""
+
+    def __init__(self, numbers: Sequence[int]) -> None:
+        """Initialize the column with numbers, an array or a memoryview
+        of one."""
+        self.numbers = numbers
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.numbers)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        """Value of row i, or the list of values of a slice, as text."""
+        if isinstance(i, slice):
+            return list(map(str, self.numbers[i]))
+        return str(self.numbers[i])
+
+    def nbytes(self) -> int:
+        """Bytes taken by the array."""
+        return len(self.numbers) * self.numbers.itemsize
+
+
+class ColumnarDataset:
+    """Rows of text fields stored column by column.
+
+    A column whose values are all integers in canonical decimal form
+    becomes an IntColumn, any other a dictionary encoded Column. Rows
+    are only built back, as lists of str equal to the ones parsed,
+    for the rows asked for.
+
+    Blank rows and rows with fewer fields than the longest are kept as
+    parsed, as with a list of rows: their missing fields are stored as
+    "" and `lengths` holds the number of fields of every row, or is
+    None when the rows all have as many as there are columns.
+    """
+
+    def __init__(self, columns: List, length: int,
+                 lengths: Sequence[int] = None) -> None:
+        """Initialize the dataset.
+
+        Args:
+            columns (list): its Column and IntColumn instances.
+            length (int): number of rows.
+            lengths (array): number of fields of every row, None when
+                it is the number of columns for all of them.
+        """
+        self.columns = columns
+        self.length = length
+        self.lengths = lengths
+
+    @classmethod
+    def encode(cls, rows: Iterable[List[str]]) -> "ColumnarDataset":
+        """Encode rows column by column.
+        The rows are consumed one at a time and never all kept.
+        """
+        vocabularies = []
+        codes = []
+        lengths = None
+        width = n = 0
+        for row in rows:
+            if len(row) != width:
+                if lengths is None and n:
+                    lengths = array("L", repeat(width, n))
+                for _ in range(width, len(row)):
+                    # the rows before had no such field, stored as ""
+                    vocabularies.append({"": 0} if n else {})
+                    codes.append(array("L", [0]) * n)
+                width = len(vocabularies)
+            for value, vocabulary, column in zip(row, vocabularies, codes):
+                code = vocabulary.get(value)
+                if code is None:
+                    code = vocabulary[value] = len(vocabulary)
+                column.append(code)
+            if lengths is not None:
+                for vocabulary, column in zip(vocabularies[len(row):],
+                                              codes[len(row):]):
+                    column.append(vocabulary.setdefault("", len(vocabulary)))
+                lengths.append(len(row))
+            n += 1
+        columns = [cls.column(list(vocabulary), column)
+                   for vocabulary, column in zip(vocabularies, codes)]
+        return cls(columns, n, cls.row_lengths(lengths))
+
+    @classmethod
+    def column(cls, values: List[str], codes: Sequence[int]):
+        """The Column or IntColumn, in the smallest array, of a column
+        given as its distinct values and the code of every row."""
+        numbers = cls.integers(values)
+        if numbers is None:
+            typecode = smallest_typecode(0, max(len(values) - 1, 0), CODES)
+            return Column(values, array(typecode, codes))
+        typecode = smallest_typecode(min(numbers, default=0),
+                                     max(numbers, default=0))
+        return IntColumn(array(typecode, map(numbers.__getitem__, codes)))
+
+    @staticmethod
+    def row_lengths(lengths: Sequence[int]) -> Union[array, None]:
+        """The numbers of fields of the rows in the smallest array, or
+        None if they are None."""
+        if lengths is None:
+            return None
+        return array(smallest_typecode(0, max(lengths, default=0), CODES),
+                     lengths)
+
+    @staticmethod
+    def integers(values: List[str]) -> Union[List[int], None]:
+        """The values as ints if they all are canonical decimal ints,
+        so that str gives them back unchanged, else None."""
+        numbers = []
+        for value in values:
+            try:
+                number = int(value)
+            except ValueError:
+                return None
+            if str(number) != value:
+                return None
+            numbers.append(number)
+        return numbers
+
+    @classmethod
+    def from_csv(cls, path: str, skip: int = 1,
+                 workers: int = 1) -> "ColumnarDataset":
+        """Encode the rows of the CSV file at path.
+
+        Args:
+            path (str): the CSV file.
+            skip (int): number of leading rows, e.g. a header, left out.
+            workers (int): number of processes parsing the file, see
+                parallel_csv.load_columns, or 1 to parse it here.
+        """
+        if workers != 1:
+            columns, length, lengths = load_columns(path, skip, workers)
+            return cls([cls.column(values, codes)
+                        for values, codes in columns], length,
+                       cls.row_lengths(lengths))
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            for _ in range(skip):
+                next(reader, None)
+            return cls.encode(reader)
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self.length
+
+    def __getitem__(self, i: Union[int, slice]) -> List:
+        """Row i, or the list of rows of a slice."""
+        if isinstance(i, slice):
+            if not self.columns:
+                return [[] for _ in range(*i.indices(self.length))]
+            rows = list(map(list, zip(*(column[i]
+                                        for column in self.columns))))
+            if self.lengths is not None:
+                for row, n in zip(rows, self.lengths[i]):
+                    del row[n:]
+            return rows
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("row index out of range")
+        row = [column[i] for column in self.columns]
+        if self.lengths is not None:
+            del row[self.lengths[i]:]
+        return row
+
+    def __iter__(self):
+        """Iterate over the rows."""
+        for i in range(self.length):
+            yield self[i]
+
+    def nbytes(self) -> int:
+        """Bytes taken by the columns and the row lengths."""
+        nbytes = sum(column.nbytes() for column in self.columns)
+        if self.lengths is not None:
+            nbytes += len(self.lengths) * self.lengths.itemsize
+        return nbytes
+
+
+def list_nbytes(rows: List[List[str]]) -> int:
+    """Bytes taken by a list of rows of str, shared str counted once.
+    """
+    seen = set()
+    total = sys.getsizeof(rows)
+    for row in rows:
+        total += sys.getsizeof(row)
+        for value in row:
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
+
+
+if __name__ == "__main__":
+    from csv_index import CSVIndex
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "Popular_Baby_Names.csv"
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))[1:]
+    index = CSVIndex(path)
+    columnar = ColumnarDataset.from_csv(path)
+    assert columnar[:] == rows
+    line = "{:<10}{:>14}{:>12}"
+    print(line.format("storage", "bytes", "B/row"))
+    for name, nbytes in (("list", list_nbytes(rows)),
+                         ("mmap", sys.getsizeof(index.offsets)),
+                         ("columnar", columnar.nbytes())):
+        print(line.format(name, nbytes, "{:.1f}".format(nbytes / len(rows))))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Lazy, offset-indexed access to the rows of a CSV file.
+"""
+import csv
+import io
+import mmap
+from array import array
+from itertools import accumulate, islice, repeat
+from operator import add
+from typing import List, Sequence, Union
+
+
+class CSVIndex:
+    """Rows of a CSV file parsed on demand.
+
+    The file is memory-mapped and scanned once to record the byte
+    offset where every row starts in an `array('Q')`, the end of the
+    file closing the last row. A row or a slice of rows is then parsed
+    straight from the map, so serving a page costs the parsing of that
+    page only, and memory holds 8 bytes per row instead of the rows.
+    """
+
+    def __init__(self, path: str, skip: int = 1,
+                 offsets: Sequence[int] = None) -> None:
+        """Map the file at path and index its rows.
+
+        Args:
+            path (str): the CSV file.
+            skip (int): number of leading rows, e.g. a header, left out.
+            offsets (array): offsets of the rows left once skipped and
+                of the end of the file, e.g. from a sidecar.Sidecar,
+                instead of indexing the file.
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        except ValueError:
+            self.map = b""
+        if offsets is None:
+            offsets = self.index(self.map)[skip:]
+        self.offsets = offsets
+        if not self.offsets:
+            self.offsets.append(len(self.map))
+
+    CHUNK = 1 << 24
+
+    @classmethod
+    def index(cls, data: bytes, start: int = 0) -> array:
+        """Offsets of the rows of data from start, then of its end.
+
+        Data is scanned by chunks of whole lines. A chunk without any
+        quote is split at its newlines in C; in the others a line
+        holding an odd number of quotes is joined to the next one, as
+        a quoted field may span lines.
+        """
+        offsets = array("Q")
+        end = len(data)
+        pos = start
+        quoted = False
+        while pos < end:
+            stop = min(pos + cls.CHUNK, end)
+            if stop < end:
+                newline = data.rfind(b"\n", pos, stop)
+                if newline < 0:
+                    newline = data.find(b"\n", stop)
+                stop = end if newline < 0 else newline + 1
+            chunk = data[pos:stop]
+            if not quoted and b'"' not in chunk:
+                lengths = map(len, chunk.split(b"\n"))
+                starts = accumulate(map(add, lengths, repeat(1)),
+                                    initial=pos)
+                offsets.extend(islice(starts, chunk.count(b"\n") +
+                                      (not chunk.endswith(b"\n"))))
+            else:
+                row = 0
+                while row < len(chunk):
+                    if not quoted:
+                        offsets.append(pos + row)
+                    line_end = chunk.find(b"\n", row)
+                    line_end = len(chunk) if line_end < 0 else line_end + 1
+                    if chunk.count(b'"', row, line_end) % 2:
+                        quoted = not quoted
+                    row = line_end
+            pos = stop
+        offsets.append(end)
+        return offsets
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.offsets) - 1
+
+    def parse(self, start: int, stop: int) -> List[List[str]]:
+        """Parse rows start to stop, stop excluded."""
+        if start >= stop:
+            return []
+        offsets = self.offsets
+        text = self.map[offsets[start]:offsets[stop]].decode()
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    def __getitem__(self, i: Union[int, slice]) -> List:
+        """Row i, or the list of rows of a slice."""
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return self.parse(start, stop)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        return self.parse(i, i + 1)[0]
+
+    def __iter__(self):
+        """Iterate over the rows."""
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Rows appended to a CSV file, and snapshots of a growing dataset.
+"""
+import os
+import threading
+import time
+from typing import List, Sequence, Tuple, Union
+
+from csv_index import CSVIndex
+from parallel_csv import load, map_file, parse_range
+
+HEAD = 1 << 12
+
+
+class CSVTail:
+    """The part of a CSV file parsed so far, for a file appended to.
+
+    `offset` is the end of the last complete row parsed. A row being
+    written, without its final newline or with a quoted field still
+    open, is left for a later call; so is a last row never ended by a
+    newline. A file that shrank or whose first bytes changed was
+    rewritten rather than appended to, and cannot be followed.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Follow the file at path from its start."""
+        self.path = path
+        self.offset = 0
+        self.size = None
+        self.mtime_ns = None
+        self.head = b""
+
+    def changed(self) -> bool:
+        """Tell if the file was modified since it was last read, by its
+        size and modification time."""
+        stat = os.stat(self.path)
+        return (stat.st_size, stat.st_mtime_ns) != (self.size,
+                                                    self.mtime_ns)
+
+    @staticmethod
+    def complete(data: bytes, start: int) -> int:
+        """End of the last complete row of data from start, which is
+        the start of a row."""
+        end = len(data)
+        if start == end:
+            return end
+        quotes = sum(data[pos:pos + CSVIndex.CHUNK].count(b'"')
+                     for pos in range(start, end, CSVIndex.CHUNK))
+        if quotes % 2 == 0 and data[end - 1:end] == b"\n":
+            return end
+        # the last row is incomplete: find where it starts
+        return CSVIndex.index(data, start)[-2]
+
+    def advance(self) -> Tuple[int, int]:
+        """Bytes start to stop of the rows completed since the last
+        call, which then starts from stop.
+
+        Raises:
+            ValueError: when the file was not only appended to.
+        """
+        stat = os.stat(self.path)
+        data = map_file(self.path)
+        if len(data) < self.offset or data[:len(self.head)] != self.head:
+            raise ValueError("{} was rewritten".format(self.path))
+        start = self.offset
+        self.offset = self.complete(data, start)
+        self.size, self.mtime_ns = stat.st_size, stat.st_mtime_ns
+        if len(self.head) < HEAD:
+            self.head = data[:min(self.offset, HEAD)]
+        return start, self.offset
+
+    def read(self) -> List[List[str]]:
+        """Parse the rows completed since the last call."""
+        start, stop = self.advance()
+        return parse_range(self.path, start, stop)
+
+
+class Snapshot(Sequence):
+    """The first rows of an append-only list, frozen.
+
+    Rows are only ever appended to the list, so its first `length`
+    rows never change: a reader holding a snapshot sees the same rows
+    and the same length while the list grows.
+    """
+
+    def __init__(self, rows: List[List], length: int = None) -> None:
+        """Snapshot the first length rows, all of them if None."""
+        self.rows = rows
+        self.length = len(rows) if length is None else length
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self.length
+
+    def __getitem__(self, i: Union[int, slice]) -> List:
+        """Row i, or the list of rows of a slice."""
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.length)
+            return self.rows[start:stop:step]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("row index out of range")
+        return self.rows[i]
+
+
+class GrowingDataset:
+    """Rows of a CSV file appended to, read again incrementally.
+
+    `snapshot` is a Snapshot of the rows read so far. `reload` parses
+    the rows completed since, appends them to the same list and only
+    then publishes a new snapshot, so readers never see a row being
+    added, nor a length changing under them.
+    """
+
+    def __init__(self, path: str, skip: int = 1, workers: int = 1,
+                 interval: float = 1.0) -> None:
+        """Read the complete rows of the file at path.
+
+        Args:
+            path (str): the CSV file.
+            skip (int): number of leading rows, e.g. a header, left out.
+            workers (int): number of processes parsing the file, see
+                parallel_csv.load.
+            interval (float): seconds between two checks of the file
+                by `due`.
+        """
+        self.tail = CSVTail(path)
+        self.lock = threading.RLock()
+        _, stop = self.tail.advance()
+        self.rows = load(path, skip, workers, stop) if stop else []
+        self.skip = 0 if stop else skip
+        self.snapshot = Snapshot(self.rows)
+        self.interval = interval
+        self.checked = time.monotonic()
+
+    def due(self) -> bool:
+        """Tell if the file changed, checking it at most once per
+        interval."""
+        now = time.monotonic()
+        if now < self.checked + self.interval:
+            return False
+        self.checked = now
+        return self.tail.changed()
+
+    def reload(self) -> int:
+        """Add the rows completed since the last read, return how many.
+        """
+        with self.lock:
+            rows = self.tail.read()
+            skip = min(self.skip, len(rows))
+            self.skip -= skip
+            self.rows.extend(rows[skip:])
+            self.snapshot = Snapshot(self.rows)
+            return len(rows) - skip
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Prefix, substring and fuzzy search of the names of a dataset.
+
+Usage: python3 name_search.py [FILE] prints the latency of each kind
+of search against a scan of every row.
+"""
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import List, Tuple
+
+from secondary_index import TableIndex
+
+
+class NameSearch:
+    """Search indexes over the distinct values of a name column.
+
+    Names are compared case-insensitively. A prefix search bisects the
+    sorted array of the names; a substring search intersects the
+    postings of the n-grams of the query in `grams`, which maps every
+    n-gram to the sorted ids of the names having it, then checks the
+    few candidates left. A fuzzy search finds the names whose n-grams
+    are similar (Jaccard index) to the query's, or which are a few
+    typos (edit distance) away from it, most alike first. The n-grams
+    of the names and of a fuzzy query are taken with n - 1 spaces
+    before and one after them, so that their first and last letters
+    weigh as much as the others and a typo in a short name still
+    leaves grams in common. The matching rows come from the postings
+    of a TableIndex, and the RESULTS most recent searches are kept
+    for their next pages.
+    """
+    RESULTS = 64
+    MODES = ("prefix", "substring", "fuzzy")
+
+    def __init__(self, index: TableIndex,
+                 column: str = "Child's First Name", n: int = 3) -> None:
+        """Build the search indexes of a column.
+
+        Args:
+            index (TableIndex): the secondary indexes of the dataset.
+            column (str): the name of the column searched.
+            n (int): length of the n-grams.
+        """
+        postings = index.postings(column)
+        self.index = index
+        self.column = column
+        self.postings = postings
+        self.n = n
+        self.names = sorted(postings, key=str.casefold)
+        self.keys = [name.casefold() for name in self.names]
+        self.rows = [postings[name] for name in self.names]
+        self.grams = {}
+        self.gram_counts = array("I")
+        for i, key in enumerate(self.keys):
+            grams = self.ngrams(self.pad(key))
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                ids = self.grams.get(gram)
+                if ids is None:
+                    ids = self.grams[gram] = array("I")
+                ids.append(i)
+        self.deletions = {}
+        for i, key in enumerate(self.keys):
+            for variant in self.deleted(key):
+                self.deletions.setdefault(variant, []).append(i)
+        self.__results = OrderedDict()
+
+    def refresh(self) -> "NameSearch":
+        """This search once rows were added to its TableIndex: a new
+        one if they hold new names, else this one without its kept
+        results, the postings of its names having grown in place."""
+        with self.index.lock:
+            if len(self.postings) != len(self.names):
+                return NameSearch(self.index, self.column, self.n)
+            self.__results.clear()
+            return self
+
+    def ngrams(self, text: str) -> set:
+        """The distinct n-grams of text."""
+        n = self.n
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    @staticmethod
+    def deleted(text: str) -> set:
+        """text and the texts it gives with one letter deleted."""
+        return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+    def pad(self, text: str) -> str:
+        """text between the spaces of its boundary n-grams."""
+        return " " * (self.n - 1) + text + " "
+
+    @staticmethod
+    def distance(a: str, b: str, bound: int = None) -> int:
+        """Edit distance of a and b: insertions, deletions,
+        substitutions and transpositions of adjacent letters; or any
+        number above bound as soon as it is sure to exceed it."""
+        if a == b:
+            return 0
+        if bound is not None and abs(len(a) - len(b)) > bound:
+            return bound + 1
+        before, previous = None, list(range(len(b) + 1))
+        for i, x in enumerate(a, 1):
+            current = [i]
+            for j, y in enumerate(b, 1):
+                cost = min(previous[j] + 1, current[j - 1] + 1,
+                           previous[j - 1] + (x != y))
+                if (i > 1 and j > 1 and x == b[j - 2] and
+                        a[i - 2] == y):
+                    cost = min(cost, before[j - 2] + 1)
+                current.append(cost)
+            if bound is not None and min(current) > bound:
+                return bound + 1
+            before, previous = previous, current
+        return previous[-1]
+
+    @staticmethod
+    def one_typo(a: str, b: str) -> bool:
+        """Tell if a and b are at most one typo apart, in linear time.
+        """
+        if len(a) > len(b):
+            a, b = b, a
+        if len(b) - len(a) > 1:
+            return False
+        i = 0
+        while i < len(a) and a[i] == b[i]:
+            i += 1
+        if len(a) < len(b):
+            return a[i:] == b[i + 1:]
+        if i == len(a) or a[i + 1:] == b[i + 1:]:
+            return True
+        return (i + 1 < len(a) and a[i] == b[i + 1] and
+                a[i + 1] == b[i] and a[i + 2:] == b[i + 2:])
+
+    def prefix(self, query: str) -> List[int]:
+        """Ids of the names starting with query."""
+        query = query.casefold()
+        low = bisect_left(self.keys, query)
+        high = bisect_left(self.keys, query + "\U0010ffff", low)
+        return list(range(low, high))
+
+    def substring(self, query: str) -> List[int]:
+        """Ids of the names containing query."""
+        query = query.casefold()
+        grams = self.ngrams(query)
+        if not grams:
+            return [i for i, key in enumerate(self.keys) if query in key]
+        postings = sorted((self.grams.get(gram, ()) for gram in grams),
+                          key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+        return sorted(i for i in candidates if query in self.keys[i])
+
+    def fuzzy(self, query: str, threshold: float = 0.4,
+              edits: int = None) -> List[int]:
+        """Ids of the names whose n-grams are similar to the query's,
+        or at most edits typos away from it, fewest typos then most
+        similar first.
+
+        Args:
+            query (str): the name searched.
+            threshold (float): least Jaccard index of the n-grams of a
+                similar name.
+            edits (int): most typos, 1 + one per 8 letters if None.
+        """
+        query = query.casefold()
+        if edits is None:
+            edits = 1 + len(query) // 8
+        grams = self.ngrams(self.pad(query))
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        if edits == 1:
+            # names one typo away share a text with one letter deleted
+            typos = {i for variant in self.deleted(query)
+                     for i in self.deletions.get(variant, ())
+                     if self.one_typo(query, self.keys[i])}
+        else:
+            # a typo changes at most n + 1 n-grams, a transposition
+            least = len(grams) - edits * (self.n + 1)
+            typos = {i for i, count in shared.items() if count >= least and
+                     self.distance(query, self.keys[i], edits) <= edits}
+        ranked = []
+        for i in typos.union(shared):
+            count = shared.get(i, 0)
+            score = count / (len(grams) + self.gram_counts[i] - count)
+            if score >= threshold or i in typos:
+                distance = self.distance(query, self.keys[i])
+                ranked.append((distance, -score, i))
+        return [i for _, _, i in sorted(ranked)]
+
+    def positions(self, query: str, mode: str = "prefix") -> List[int]:
+        """Positions of the rows whose name matches query, in dataset
+        order, or by similarity for a fuzzy search."""
+        if mode not in self.MODES:
+            raise ValueError("mode must be one of {}".format(
+                ", ".join(self.MODES)))
+        key = (mode, query)
+        with self.index.lock:
+            positions = self.__results.get(key)
+            if positions is not None:
+                self.__results.move_to_end(key)
+                return positions
+            ids = getattr(self, mode)(query)
+            if mode == "fuzzy":
+                positions = [position for i in ids
+                             for position in self.rows[i]]
+            else:
+                # timsort merges the sorted runs, faster than heapq.merge
+                positions = sorted(chain.from_iterable(
+                    self.rows[i] for i in ids))
+            self.__results[key] = positions
+            if len(self.__results) > self.RESULTS:
+                self.__results.popitem(last=False)
+        return positions
+
+    def page(self, query: str, mode: str = "prefix", page: int = 1,
+             page_size: int = 10) -> Tuple[List[int], int]:
+        """Positions of a page of the rows matching query, and the
+        number of matching rows."""
+        positions = self.positions(query, mode)
+        start = (page - 1) * page_size
+        return positions[start:start + page_size], len(positions)
+
+
+if __name__ == "__main__":
+    import csv
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "Popular_Baby_Names.csv"
+    with open(path) as f:
+        rows = list(csv.reader(f))
+    start = time.perf_counter()
+    search = NameSearch(TableIndex(rows, rows[0], first=1))
+    print("indexed {} rows, {} names in {:.3f}s".format(
+        len(rows) - 1, len(search.names), time.perf_counter() - start))
+    column = rows[0].index("Child's First Name")
+    queries = sorted({name[:n] for name in search.names[::max(
+        len(search.names) // 50, 1)] for n in (1, 3)})
+
+    def scan(query: str) -> List[List]:
+        """Rows whose name contains query, by a scan of every row."""
+        query = query.casefold()
+        return [row for row in rows[1:] if query in row[column].casefold()]
+
+    line = "{:<10}{:>14}"
+    print(line.format("search", "us/query"))
+    for mode in NameSearch.MODES + ("scan",):
+        start = time.perf_counter()
+        for query in queries:
+            if mode == "scan":
+                scan(query)
+            else:
+                search.page(query, mode)
+        elapsed = time.perf_counter() - start
+        print(line.format(mode, "{:.1f}".format(
+            elapsed / len(queries) * 1e6)))
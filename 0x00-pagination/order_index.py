@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Order-statistic index of the live rows of a dataset.
+"""
+import threading
+from array import array
+from collections.abc import MutableMapping
+from typing import Iterator, List, Sequence, Tuple
+
+
+class FenwickIndex:
+    """Set of live positions 0 to capacity - 1, in a Fenwick tree.
+
+    `live` is a bitmap of the positions, one byte each, and `tree` a
+    Fenwick (binary indexed) tree of their counts. Deleting or
+    inserting a position, counting the live positions before one and
+    finding the k-th live position all take O(log n).
+    """
+
+    def __init__(self, capacity: int = 0, live: bool = True) -> None:
+        """Initialize positions 0 to capacity - 1, all live or not."""
+        self.live = bytearray([1 if live else 0]) * capacity
+        self.count = capacity if live else 0
+        self.__build()
+
+    def __build(self) -> None:
+        """Rebuild the tree from the bitmap in O(n)."""
+        n = len(self.live)
+        tree = array("q", [0]) * (n + 1)
+        for i in range(1, n + 1):
+            tree[i] += self.live[i - 1]
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.tree = tree
+        self.top = 1 << n.bit_length() >> 1
+
+    def __add(self, position: int, delta: int) -> None:
+        """Add delta to the count of position."""
+        tree = self.tree
+        n = len(tree) - 1
+        i = position + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+        self.count += delta
+
+    def __len__(self) -> int:
+        """Number of live positions."""
+        return self.count
+
+    def __contains__(self, position: int) -> bool:
+        """Tell if position is live."""
+        return 0 <= position < len(self.live) and bool(self.live[position])
+
+    def grow(self, capacity: int) -> None:
+        """Add positions, not live, up to at least capacity - 1. The
+        capacity is at least doubled, the tree being rebuilt, so that
+        growing by one position is amortized O(log n)."""
+        if capacity <= len(self.live):
+            return
+        capacity = max(capacity, 2 * len(self.live))
+        self.live.extend(bytes(capacity - len(self.live)))
+        self.__build()
+
+    def insert(self, position: int) -> bool:
+        """Make position live, growing the index if needed. Return
+        False if it already was."""
+        self.grow(position + 1)
+        if self.live[position]:
+            return False
+        self.live[position] = 1
+        self.__add(position, 1)
+        return True
+
+    def delete(self, position: int) -> bool:
+        """Make position not live. Return False if it was not."""
+        if position not in self:
+            return False
+        self.live[position] = 0
+        self.__add(position, -1)
+        return True
+
+    def rank(self, position: int) -> int:
+        """Number of live positions before position."""
+        tree = self.tree
+        i = min(max(position, 0), len(tree) - 1)
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def select(self, k: int) -> int:
+        """Position of the k-th live position, counting from 0."""
+        if not 0 <= k < self.count:
+            raise IndexError("live position out of range")
+        tree = self.tree
+        n = len(tree) - 1
+        position = 0
+        step = self.top
+        while step:
+            i = position + step
+            if i <= n and tree[i] <= k:
+                position = i
+                k -= tree[i]
+            step >>= 1
+        return position
+
+    def next(self, position: int, k: int) -> List[int]:
+        """The first k live positions from position on, or fewer, each
+        found by its rank in O(log n), however many positions were
+        deleted between them."""
+        first = self.rank(position)
+        return [self.select(i)
+                for i in range(first, min(first + max(k, 0), self.count))]
+
+
+class IndexedDataset(MutableMapping):
+    """Rows of a dataset keyed by their index, surviving deletions.
+
+    It behaves as the dict {index: row} it replaces, rows deleted with
+    `del` being skipped by `page` instead of leaving holes, and holds
+    a lock so pages stay consistent while other threads delete rows.
+    `version` counts the changes, telling a cached page is stale.
+
+    The rows are never copied nor changed, so they may be a storage
+    shared with other processes: deletions only mark the index, and
+    rows set afterwards are kept apart in `updates`.
+    """
+
+    def __init__(self, rows: Sequence[List]) -> None:
+        """Index rows, all live, by their position."""
+        self.rows = rows
+        self.updates = {}
+        self.index = FenwickIndex(len(rows))
+        self.lock = threading.RLock()
+        self.version = 0
+
+    def __getitem__(self, key: int) -> List:
+        """Row of key."""
+        if key not in self:
+            raise KeyError(key)
+        return self.row(key)
+
+    def row(self, key: int) -> List:
+        """Row of a live key."""
+        if key in self.updates:
+            return self.updates[key]
+        return self.rows[key]
+
+    def __setitem__(self, key: int, row: List) -> None:
+        """Set the row of key, inserting it if it was deleted or new."""
+        if not isinstance(key, int) or key < 0:
+            raise KeyError(key)
+        with self.lock:
+            self.updates[key] = row
+            self.index.insert(key)
+            self.version += 1
+
+    def __delitem__(self, key: int) -> None:
+        """Delete the row of key."""
+        with self.lock:
+            if not self.index.delete(key):
+                raise KeyError(key)
+            self.updates.pop(key, None)
+            self.version += 1
+
+    def __contains__(self, key: object) -> bool:
+        """Tell if key has a row."""
+        return isinstance(key, int) and key in self.index
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the keys in order."""
+        live = self.index.live
+        for key in range(len(live)):
+            if live[key]:
+                yield key
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.index)
+
+    def last(self) -> int:
+        """Greatest key, as max(self.keys()) in O(log n)."""
+        with self.lock:
+            if not self.index:
+                raise ValueError("empty dataset")
+            return self.index.select(len(self.index) - 1)
+
+    def page(self, start: int, size: int) -> List[Tuple[int, List]]:
+        """The (key, row) pairs of the first size keys from start on.
+        """
+        with self.lock:
+            return [(key, self.row(key))
+                    for key in self.index.next(start, size)]
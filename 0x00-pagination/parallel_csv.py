@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Parallel parsing of a CSV file, into rows or columns.
+
+Usage: python3 parallel_csv.py [FILE] [WORKERS...] prints the time
+taken to load the file as rows and as columns with each number of
+workers.
+"""
+import csv
+import gc
+import io
+import mmap
+import multiprocessing
+import os
+from array import array
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Iterator, List, Optional, Tuple, Union
+
+CHUNKS_PER_WORKER = 4
+
+
+def map_file(path: str):
+    """Map the file at path read-only, or its empty content."""
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""
+
+
+def count_quotes(path: str, start: int, stop: int) -> int:
+    """Number of quote characters in bytes start to stop of a file."""
+    data = map_file(path)
+    return data[start:stop].count(b'"')
+
+
+def parse_range(path: str, start: int, stop: int,
+                skip: int = 0) -> List[List[str]]:
+    """Rows in bytes start to stop of a file, which are whole rows,
+    but for the first skip ones."""
+    data = map_file(path)
+    text = data[start:stop].decode()
+    return list(csv.reader(io.StringIO(text, newline="")))[skip:]
+
+
+def encode_rows(rows: List[List[str]]) -> Union[tuple, List[List[str]]]:
+    """Rows as a tuple of columns, each a list of its distinct values
+    and an array of the index of the value of every row, or the rows
+    themselves when they are not all of the same length or blank."""
+    if len({len(row) for row in rows}) != 1 or not rows[0]:
+        return rows
+    columns = []
+    for column in zip(*rows):
+        values = list(dict.fromkeys(column))
+        codes = {value: code for code, value in enumerate(values)}
+        columns.append((values,
+                        array("I", map(codes.__getitem__, column))))
+    return tuple(columns)
+
+
+def decode_rows(encoded: Union[tuple, List[List[str]]],
+                strings: dict) -> List[List[str]]:
+    """Rows of encode_rows, the equal values of which are made the
+    same str object from strings, that of all the decoded rows."""
+    if not isinstance(encoded, tuple):
+        return encoded
+    columns = []
+    for values, codes in encoded:
+        values = [strings.setdefault(value, value) for value in values]
+        columns.append(map(values.__getitem__, codes))
+    return list(map(list, zip(*columns)))
+
+
+def parse_task(task: Tuple[str, int, int, int]) -> Union[tuple, List]:
+    """Encoded rows of a (path, start, stop, skip) range, for
+    Pool.imap."""
+    gc.disable()
+    return encode_rows(parse_range(*task))
+
+
+def split_ranges(path: str, chunks: int, pool=None,
+                 size: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Split the first size bytes of a file, all of them if size is
+    None, into about chunks byte ranges of whole rows.
+
+    The file is first cut after the newline following each multiple
+    of its size / chunks. A cut after an odd number of quotes, counted
+    by the pool over each range, falls inside a quoted field spanning
+    lines, and is moved to the next newline where the count is even.
+    """
+    data = map_file(path)
+    if size is None:
+        size = len(data)
+    cuts = [0]
+    for i in range(1, chunks):
+        newline = data.find(b"\n", max(size * i // chunks, cuts[-1]),
+                            size)
+        if newline < 0:
+            break
+        if newline + 1 > cuts[-1]:
+            cuts.append(newline + 1)
+    if cuts[-1] < size:
+        cuts.append(size)
+    ranges = list(zip(cuts, cuts[1:]))
+    if pool is None:
+        quotes = [count_quotes(path, *bounds) for bounds in ranges]
+    else:
+        quotes = pool.starmap(count_quotes, [(path,) + bounds
+                                             for bounds in ranges])
+    aligned = [0]
+    quoted = False
+    for (start, stop), count in zip(ranges, quotes):
+        if stop <= aligned[-1]:
+            continue
+        if start < aligned[-1]:
+            # the previous cut moved into this range, recount its end
+            count = data[aligned[-1]:stop].count(b'"')
+        if stop == size:
+            break
+        quoted ^= count % 2 == 1
+        while quoted and stop < size:
+            newline = data.find(b"\n", stop, size)
+            line_end = size if newline < 0 else newline + 1
+            quoted ^= data[stop:line_end].count(b'"') % 2 == 1
+            stop = line_end
+        if stop > aligned[-1]:
+            aligned.append(stop)
+    if aligned[-1] < size:
+        aligned.append(size)
+    return list(zip(aligned, aligned[1:]))
+
+
+@contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector, which the millions of lists
+    created by a load would trigger over and over for nothing."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def parse_chunks(path: str, skip: int, workers: int,
+                 size: Optional[int] = None) -> Iterator[Union[tuple, List]]:
+    """The encoded rows of the ranges of the first size bytes of a
+    file, in order, parsed by a pool of workers processes while the
+    previous ones are consumed.
+    """
+    if size is None:
+        size = len(map_file(path))
+    if workers <= 1:
+        yield encode_rows(parse_range(path, 0, size, skip))
+        return
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        ranges = split_ranges(path, workers * CHUNKS_PER_WORKER, pool,
+                              size)
+        tasks = [(path, start, stop, skip if i == 0 else 0)
+                 for i, (start, stop) in enumerate(ranges)]
+        yield from pool.imap(parse_task, tasks)
+
+
+def load(path: str, skip: int = 1, workers: Optional[int] = None,
+         size: Optional[int] = None) -> List[List[str]]:
+    """Parse the rows of the CSV file at path with a pool of processes.
+
+    The file is split into byte ranges of whole rows, a few per worker
+    so that they stay busy, and parsed by the pool. Unpickling rows
+    would cost this process as much as parsing them, so a worker sends
+    them dictionary encoded, as arrays and few strings, and the rows
+    of each range are rebuilt in order as soon as it arrives; the
+    equal fields of all rows then share one str. With one worker the
+    file is parsed in this process. The garbage collector is paused
+    meanwhile.
+
+    Args:
+        path (str): the CSV file.
+        skip (int): number of leading rows, e.g. a header, left out.
+        workers (int): number of processes, os.cpu_count() if None.
+        size (int): number of bytes of the file to parse, e.g. up to
+            the end of its last complete row; all of them if None.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with paused_gc():
+        if workers <= 1 and size is not None:
+            return parse_range(path, 0, size, skip)
+        if workers <= 1:
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.reader(f))
+            return rows[skip:]
+        rows = []
+        strings = {}
+        for encoded in parse_chunks(path, skip, workers, size):
+            rows.extend(decode_rows(encoded, strings))
+        return rows
+
+
+def load_columns(path: str, skip: int = 1, workers: Optional[int] = None
+                 ) -> Tuple[List[Tuple[List[str], array]], int,
+                            Optional[array]]:
+    """Parse the CSV file at path into dictionary encoded columns with
+    a pool of processes.
+
+    As load, but the columns of the ranges are merged without building
+    any row: the distinct values of a range are mapped once to those
+    of the whole file, and its codes translated, so this process does
+    little work per row and the load scales with the workers. Blank
+    rows and rows shorter than others have their missing fields
+    stored as "".
+
+    Returns:
+        tuple: the columns, each the list of its distinct values and
+            the array('L') of the code of every row, the number of
+            rows, and the array('L') of the number of fields of every
+            row, None when they all have one per column.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    columns = []
+    lengths = None
+    length = 0
+    with paused_gc():
+        for encoded in parse_chunks(path, skip, workers):
+            if not encoded:
+                continue
+            counts = None
+            if not isinstance(encoded, tuple):
+                # rows of different lengths, sent as parsed
+                counts = array("L", map(len, encoded))
+                width = max(counts)
+                encoded = encode_rows([row + [""] * (width - len(row))
+                                       for row in encoded]) if width else ()
+            count = len(counts) if counts else len(encoded[0][1])
+            if lengths is None and (counts or length and
+                                    len(encoded) != len(columns)):
+                lengths = array("L", repeat(len(columns), length))
+            for _ in range(len(columns), len(encoded)):
+                # the rows before had no such field, stored as ""
+                columns.append(({"": 0} if length else {},
+                                array("L", [0]) * length))
+            for i, (index, merged) in enumerate(columns):
+                if i < len(encoded):
+                    values, codes = encoded[i]
+                    translation = [index.setdefault(value, len(index))
+                                   for value in values]
+                    merged.extend(map(translation.__getitem__, codes))
+                else:
+                    pad = index.setdefault("", len(index))
+                    merged.extend(array("L", [pad]) * count)
+            if lengths is not None:
+                lengths.extend(counts or repeat(len(encoded), count))
+            length += count
+    columns = [(list(index), codes) for index, codes in columns]
+    return columns, length, lengths
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "Popular_Baby_Names.csv"
+    counts = [int(n) for n in sys.argv[2:]] or [1, 2, 4, os.cpu_count()]
+    line = "{:<10}{:>10}{:>10}"
+    print(line.format("workers", "rows s", "columns s"))
+    for workers in counts:
+        start = time.perf_counter()
+        rows = load(path, workers=workers)
+        middle = time.perf_counter()
+        columns, length, _ = load_columns(path, workers=workers)
+        end = time.perf_counter()
+        assert length == len(rows)
+        del rows, columns
+        print(line.format(workers, "{:.3f}".format(middle - start),
+                          "{:.3f}".format(end - middle)))
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Secondary indexes and filtered, sorted keyset pagination.
+"""
+import base64
+import hashlib
+import json
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class View:
+    """Positions of the rows matching a filter, sorted by a column.
+
+    Entries are ordered by (sort value, row position); `values` holds
+    the sort value of every entry, so a keyset cursor is found back by
+    bisection.
+    """
+
+    def __init__(self, positions: List[int], values: List) -> None:
+        """Initialize the view with sorted positions and their values.
+        """
+        self.positions = positions
+        self.values = values
+
+    def __len__(self) -> int:
+        """Number of matching rows."""
+        return len(self.positions)
+
+    def after(self, value, position: int) -> int:
+        """Index of the first entry after (value, position)."""
+        low = bisect_left(self.values, value)
+        high = bisect_right(self.values, value, low)
+        return bisect_right(self.positions, position, low, high)
+
+    def before(self, value, position: int) -> int:
+        """Index after the last entry before (value, position)."""
+        low = bisect_left(self.values, value)
+        high = bisect_right(self.values, value, low)
+        return bisect_left(self.positions, position, low, high)
+
+
+class TableIndex:
+    """Secondary indexes over the named columns of a dataset.
+
+    For every column filtered on, `postings` maps each value to the
+    sorted positions of the rows having it, which also gives the count
+    of rows per value. A filter and sort combination is materialized
+    once as a View, the VIEWS most recently used being kept, so that
+    any page of it, however deep, costs O(log n + page_size) from an
+    opaque keyset cursor: the sort value and position of the last row
+    served. Rows appended to the dataset are added to the indexes in
+    place by `extend`, under `lock`.
+    """
+    VIEWS = 64
+
+    def __init__(self, rows: Sequence[List], columns: List[str],
+                 first: int = 0) -> None:
+        """Initialize the indexes, built on first use.
+
+        Args:
+            rows (sequence): the rows of the dataset.
+            columns (list): the names of the columns.
+            first (int): position of the first row to index, e.g. 1
+                when row 0 is the header.
+        """
+        self.rows = rows
+        self.columns = list(columns)
+        self.first = first
+        self.__values = {}
+        self.__postings = {}
+        self.__views = OrderedDict()
+        self.lock = threading.RLock()
+
+    def column(self, name: str) -> int:
+        """Number of the column called name."""
+        try:
+            return self.columns.index(name)
+        except ValueError:
+            raise ValueError("unknown column: {}".format(name)) from None
+
+    def values(self, name: str) -> List:
+        """Value of every row in the column called name, as int for a
+        column of integers so that it sorts by number."""
+        with self.lock:
+            if name not in self.__values:
+                i = self.column(name)
+                self.__values[name] = self.convert(
+                    [row[i] for row in self.rows[self.first:]])
+            return self.__values[name]
+
+    @staticmethod
+    def convert(values: List[str]) -> List:
+        """The values as ints if they all are integers, else as is."""
+        try:
+            numbers = {value: int(value) for value in set(values)}
+        except ValueError:
+            return values
+        return list(map(numbers.__getitem__, values))
+
+    def postings(self, name: str) -> Dict[str, array]:
+        """Sorted positions of the rows of each value of a column."""
+        with self.lock:
+            if name not in self.__postings:
+                self.__postings[name] = {}
+                self.add_postings(name, self.first)
+            return self.__postings[name]
+
+    def add_postings(self, name: str, start: int) -> None:
+        """Add the rows from position start on to the postings of the
+        column called name."""
+        i = self.column(name)
+        postings = self.__postings[name]
+        for position, row in enumerate(self.rows[start:], start):
+            value = row[i]
+            rows = postings.get(value)
+            if rows is None:
+                rows = postings[value] = array("I")
+            rows.append(position)
+
+    def extend(self, rows: Sequence[List]) -> None:
+        """Index the rows appended to the dataset, rows being the whole
+        dataset now. The postings grow in place, the sort values too
+        unless a column of integers got some other value, and the
+        views are dropped, to be built again with the new rows."""
+        with self.lock:
+            start = len(self.rows)
+            self.rows = rows
+            for name in self.__postings:
+                self.add_postings(name, start)
+            for name, values in list(self.__values.items()):
+                i = self.column(name)
+                added = [row[i] for row in rows[start:]]
+                if values and not isinstance(values[0], int):
+                    values.extend(added)
+                    continue
+                added = self.convert(added)
+                if not added or isinstance(added[0], int):
+                    values.extend(added)
+                else:
+                    del self.__values[name]
+            self.__views.clear()
+
+    @staticmethod
+    def filters_key(filters: Dict[str, str]) -> Tuple:
+        """The filters in a canonical, hashable form."""
+        return tuple(sorted((name, str(value))
+                            for name, value in filters.items()))
+
+    def count(self, filters: Dict[str, str]) -> int:
+        """Number of rows matching every column = value of filters,
+        read from the postings for no or one filter, else from any
+        kept view of the same filters, whatever its sort."""
+        with self.lock:
+            if not filters:
+                return max(len(self.rows) - self.first, 0)
+            if len(filters) == 1:
+                (name, value), = filters.items()
+                return len(self.postings(name).get(str(value), ()))
+            key = self.filters_key(filters)
+            for (view_filters, _), view in self.__views.items():
+                if view_filters == key:
+                    return len(view)
+            return len(self.view(filters, None))
+
+    def view(self, filters: Dict[str, str], sort: Optional[str]) -> View:
+        """The View of the rows matching filters sorted by the column
+        sort, or by position when sort is None."""
+        with self.lock:
+            key = (self.filters_key(filters), sort)
+            view = self.__views.get(key)
+            if view is not None:
+                self.__views.move_to_end(key)
+                return view
+            matches = None
+            lists = sorted((self.postings(name).get(str(value), array("I"))
+                            for name, value in filters.items()), key=len)
+            for rows in lists:
+                if matches is None:
+                    matches = rows
+                else:
+                    rows = set(rows)
+                    matches = [position for position in matches
+                               if position in rows]
+            if matches is None:
+                matches = range(self.first, len(self.rows))
+            if sort is None:
+                positions = list(matches)
+                view = View(positions, [0] * len(positions))
+            else:
+                values = self.values(sort)
+                first = self.first
+                pairs = sorted((values[position - first], position)
+                               for position in matches)
+                view = View([position for _, position in pairs],
+                            [value for value, _ in pairs])
+            self.__views[key] = view
+            if len(self.__views) > self.VIEWS:
+                self.__views.popitem(last=False)
+            return view
+
+    @staticmethod
+    def signature(filters: Dict[str, str], sort: Optional[str]) -> str:
+        """Short digest of a query, tying its cursors to it."""
+        query = json.dumps([sorted((name, str(value))
+                                   for name, value in filters.items()),
+                            sort])
+        return hashlib.blake2b(query.encode(), digest_size=6).hexdigest()
+
+    def page(self, filters: Dict[str, str], sort: Optional[str] = None,
+             cursor: Optional[str] = None, page_size: int = 10
+             ) -> Tuple[List[int], Optional[str], int]:
+        """Positions of a page of the rows matching filters, sorted by
+        the column sort, descending if its name starts with "-".
+
+        Returns:
+            tuple: the positions, the cursor of the next page or None
+                after the last one, and the number of matching rows.
+        """
+        descending = sort is not None and sort.startswith("-")
+        column = sort[1:] if descending else sort
+        with self.lock:
+            view = self.view(filters, column)
+            total = self.count(filters)
+        signature = self.signature(filters, sort)
+        if cursor is None:
+            start = len(view) if descending else 0
+        else:
+            try:
+                query, value, position = json.loads(
+                    base64.urlsafe_b64decode(cursor.encode()))
+            except (TypeError, ValueError):
+                raise ValueError("invalid cursor") from None
+            if query != signature:
+                raise ValueError("cursor of another query")
+            if descending:
+                start = view.before(value, position)
+            else:
+                start = view.after(value, position)
+        if descending:
+            indexes = range(start - 1, max(start - page_size, 0) - 1, -1)
+            more = start - page_size > 0
+        else:
+            indexes = range(start, min(start + page_size, len(view)))
+            more = start + page_size < len(view)
+        positions = [view.positions[i] for i in indexes]
+        next_cursor = None
+        if more and positions:
+            last = indexes[-1]
+            next_cursor = base64.urlsafe_b64encode(json.dumps(
+                [signature, view.values[last], view.positions[last]]
+            ).encode()).decode()
+        return positions, next_cursor, total
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Binary sidecar of a CSV file, sparing later processes its parsing.
+
+The sidecar stores the row offsets of csv_index.CSVIndex and the
+columns, and row lengths if they differ, of columnar.ColumnarDataset
+next to the CSV file. It is keyed by the size, modification time and
+a digest of the CSV file; a process finding a sidecar that does not
+match rebuilds it. Its arrays are memory-mapped, so loading it copies
+nothing but the distinct values of the dictionary encoded columns.
+
+Layout: MAGIC, the offset of the header as 8 bytes, the arrays each
+aligned on 8 bytes, then the header: JSON telling where the arrays
+are and what they hold.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from typing import Dict, Sequence
+
+from columnar import Column, ColumnarDataset, IntColumn
+from csv_index import CSVIndex
+
+MAGIC = b"PGSIDE\x01\n"
+DIGEST_BLOCK = 1 << 16
+
+
+def csv_key(path: str) -> Dict:
+    """Size, modification time and digest identifying the content of
+    the file at path.
+
+    The digest covers the first and last DIGEST_BLOCK bytes only, so
+    checking a sidecar stays cheap on large files; the size and the
+    modification time catch other changes.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(DIGEST_BLOCK))
+        if stat.st_size > DIGEST_BLOCK:
+            f.seek(max(stat.st_size - DIGEST_BLOCK, DIGEST_BLOCK))
+            digest.update(f.read(DIGEST_BLOCK))
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": digest.hexdigest(),
+        "byteorder": sys.byteorder,
+    }
+
+
+class Sidecar:
+    """Row offsets and columns of a CSV file, from its sidecar file.
+
+    `Sidecar.open` loads the sidecar if it matches the CSV file, else
+    indexes the CSV file and writes the sidecar. The columns are only
+    encoded when `columnar` first needs them, and then added to the
+    sidecar, so the mmap storage never pays for them. When the sidecar
+    cannot be written, e.g. in a read-only directory, the built data
+    is used from memory.
+
+    `Sidecar.attach` shares one sidecar between all its callers in a
+    process, while the CSV file is unchanged. The arrays being mapped
+    from the file, processes forked after it, or attaching the same
+    file, share their memory pages, so the memory used by the dataset
+    does not grow with them.
+    """
+    attached = {}
+    lock = threading.Lock()
+
+    def __init__(self, path: str, skip: int = 1, workers: int = 1) -> None:
+        """Initialize an empty sidecar of the CSV file at path.
+
+        Args:
+            path (str): the CSV file.
+            skip (int): number of leading rows, e.g. a header, left out.
+            workers (int): number of processes parsing the CSV file
+                when the sidecar is built.
+        """
+        self.path = path
+        self.skip = skip
+        self.workers = workers
+        self.sidecar_path = "{}.{}.sidecar".format(path, skip)
+        self.offsets = None
+        self.columns = None
+        self.lengths = None
+        self.rows = 0
+        self.key = None
+        self.map = None
+        self.columns_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str, skip: int = 1,
+             workers: int = 1) -> "Sidecar":
+        """Load the sidecar of the CSV file at path, (re)building it
+        when it is missing or stale."""
+        sidecar = cls(path, skip, workers)
+        if not sidecar.load():
+            sidecar.build()
+        return sidecar
+
+    @classmethod
+    def attach(cls, path: str, skip: int = 1,
+               workers: int = 1) -> "Sidecar":
+        """The sidecar of the CSV file at path of this process, opened
+        by the first caller, and again by a caller finding that the
+        CSV file changed since."""
+        key = (os.path.abspath(path), skip)
+        with cls.lock:
+            sidecar = cls.attached.get(key)
+            if sidecar is None or sidecar.key != csv_key(path):
+                sidecar = cls.open(path, skip, workers)
+                cls.attached[key] = sidecar
+            return sidecar
+
+    def load(self) -> bool:
+        """Map the sidecar file; return False if it is missing, stale
+        or unreadable."""
+        try:
+            with open(self.sidecar_path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        try:
+            header = None
+            if data[:len(MAGIC)] == MAGIC:
+                start, = struct.unpack_from("<Q", data, len(MAGIC))
+                header = json.loads(data[start:].decode())
+            if header is None or header["key"] != csv_key(self.path):
+                data.close()
+                return False
+        except (OSError, ValueError, KeyError, struct.error):
+            data.close()
+            return False
+        view = memoryview(data)
+
+        def array_at(entry: Dict) -> memoryview:
+            """The array described by a header entry, as a view."""
+            size = struct.calcsize(entry["typecode"])
+            end = entry["pos"] + entry["count"] * size
+            return view[entry["pos"]:end].cast(entry["typecode"])
+
+        self.offsets = array_at(header["offsets"])
+        self.columns = None
+        if header["columns"] is not None:
+            self.columns = []
+            for entry in header["columns"]:
+                if "values" in entry:
+                    self.columns.append(Column(entry["values"],
+                                               array_at(entry)))
+                else:
+                    self.columns.append(IntColumn(array_at(entry)))
+        if header.get("lengths") is not None:
+            self.lengths = array_at(header["lengths"])
+        self.rows = header["rows"]
+        self.key = header["key"]
+        self.map = data
+        return True
+
+    def build(self) -> None:
+        """Index the CSV file, then write the sidecar and map it."""
+        self.key = csv_key(self.path)
+        index = CSVIndex(self.path, self.skip)
+        self.offsets = index.offsets
+        self.rows = len(index)
+        index.close()
+        self.save()
+
+    def build_columns(self) -> None:
+        """Encode the CSV file, then write the sidecar with its columns
+        and map it."""
+        dataset = ColumnarDataset.from_csv(self.path, self.skip,
+                                           self.workers)
+        self.columns = dataset.columns
+        self.lengths = dataset.lengths
+        self.rows = len(dataset)
+        self.save()
+
+    def save(self) -> None:
+        """Write the sidecar and map it, or keep the built data in
+        memory if it cannot be written."""
+        try:
+            self.write(self.key)
+        except OSError:
+            return
+        self.load()
+
+    def write(self, key: Dict) -> None:
+        """Write the sidecar file, atomically replacing any old one."""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.sidecar_path)),
+            suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + bytes(8))
+
+                def write_array(numbers: Sequence[int]) -> Dict:
+                    """Write an array, or a memoryview of one mapped
+                    from the old sidecar, 8 bytes aligned, return its
+                    entry."""
+                    f.write(bytes(-f.tell() % 8))
+                    typecode = getattr(numbers, "typecode", None)
+                    entry = {"typecode": typecode or numbers.format,
+                             "pos": f.tell(), "count": len(numbers)}
+                    f.write(numbers.tobytes())
+                    return entry
+
+                header = {"key": key, "rows": self.rows,
+                          "offsets": write_array(self.offsets),
+                          "columns": None}
+                if self.columns is not None:
+                    header["columns"] = []
+                for column in self.columns or ():
+                    if isinstance(column, Column):
+                        entry = write_array(column.codes)
+                        entry["values"] = column.values
+                    else:
+                        entry = write_array(column.numbers)
+                    header["columns"].append(entry)
+                if self.lengths is not None:
+                    header["lengths"] = write_array(self.lengths)
+                start = f.tell()
+                f.write(json.dumps(header).encode())
+                f.seek(len(MAGIC))
+                f.write(struct.pack("<Q", start))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.sidecar_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def index(self) -> CSVIndex:
+        """The CSV file as a CSVIndex using the sidecar offsets."""
+        return CSVIndex(self.path, self.skip, self.offsets)
+
+    def columnar(self) -> ColumnarDataset:
+        """The CSV file as a ColumnarDataset using the sidecar columns,
+        encoded by the first call if the sidecar has none."""
+        with self.columns_lock:
+            if self.columns is None:
+                self.build_columns()
+        return ColumnarDataset(self.columns, self.rows, self.lengths)
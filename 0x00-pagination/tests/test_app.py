@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Tests of the Flask app, skipped when Flask is not installed.
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+try:
+    import flask
+except ImportError:
+    flask = None
+
+HEADER = "Year of Birth,Gender,Ethnicity,Child's First Name,Count,Rank\n"
+
+
+@unittest.skipIf(flask is None, "Flask is not installed")
+class TestApp(unittest.TestCase):
+    """The endpoints answer the pages of the Servers, with ETags."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Serve a small CSV file."""
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, "names.csv")
+        with open(path, "w") as f:
+            f.write(HEADER)
+            for i in range(30):
+                f.write("2016,FEMALE,ASIAN,Name{},{},{}\n".format(
+                    i, 100 - i, i + 1))
+        cls.app = __import__('app')
+        cls.app.Server.DATA_FILE = path
+        cls.app.IndexServer.DATA_FILE = path
+        cls.app.versions.clear()
+        cls.client = cls.app.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the CSV file."""
+        cls.directory.cleanup()
+
+    def get(self, url, etag=None):
+        """GET url, sending etag in If-None-Match."""
+        headers = {} if etag is None else {"If-None-Match": etag}
+        return self.client.get(url, headers=headers)
+
+    def test_hyper(self):
+        """A page by number, then 304 for its ETag."""
+        response = self.get("/api/v1/hyper?page=2&page_size=3")
+        self.assertEqual(response.status_code, 200)
+        page = json.loads(response.get_data())
+        self.assertEqual(page, self.app.server.get_hyper(2, 3))
+        etag = response.headers["ETag"]
+        response = self.get("/api/v1/hyper?page=2&page_size=3", etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.get("/api/v1/hyper?page=2&page_size=3")
+        self.assertEqual(json.loads(response.get_data()), page)
+
+    def test_bad_requests(self):
+        """Invalid and oversized queries are answered 400."""
+        too_large = self.app.MAX_PAGE_SIZE + 1
+        for url in ("/api/v1/hyper?page=0",
+                    "/api/v1/hyper?page_size={}".format(too_large),
+                    "/api/v1/hyper_index?index=-1",
+                    "/api/v1/hyper_index?page_size={}".format(too_large),
+                    "/api/v1/hyper_index?index=1000"):
+            response = self.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn("error", json.loads(response.get_data()))
+
+    def test_hyper_index_delete(self):
+        """A delete changes the ETag of the pages of the index."""
+        url = "/api/v1/hyper_index?index=20&page_size=2"
+        response = self.get(url)
+        etag = response.headers["ETag"]
+        self.assertEqual(self.get(url, etag).status_code, 304)
+        del self.app.index_server.indexed_dataset()[20]
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        page = json.loads(response.get_data())
+        self.assertEqual(page["data"][0][3], "Name21")
+
+    def test_delete_while_building(self):
+        """A page built after a delete is tagged with the version it
+        was built at, not the one read before."""
+        server = self.app.index_server
+        data = server.indexed_dataset()
+        url = "/api/v1/hyper_index?index=5&page_size=2"
+        build = server.get_hyper_index
+
+        def delete_then_build(index, page_size):
+            """Delete row 5 just before the page is built."""
+            server.get_hyper_index = build
+            del data[5]
+            return build(index, page_size)
+
+        server.get_hyper_index = delete_then_build
+        try:
+            stale_etag = self.get(url).headers["ETag"]
+        finally:
+            server.get_hyper_index = build
+        response = self.get(url, stale_etag)
+        self.assertEqual(response.status_code, 304)
+        page = json.loads(self.get(url).get_data())
+        self.assertEqual(page["data"][0][3], "Name6")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Tests of ColumnarDataset on blank and ragged rows.
+"""
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from columnar import ColumnarDataset  # noqa: E402
+from sidecar import Sidecar  # noqa: E402
+
+TEXT = ("year,name,count\n"
+        "2016,Olivia,172\n"
+        "\n"
+        "2016,Chloe\n"
+        "2016,Emma,101,extra\n"
+        "2017,Ava,99\n")
+
+
+class TestRaggedRows(unittest.TestCase):
+    """Every storage returns the rows a csv.reader returns."""
+
+    def setUp(self):
+        """Write TEXT to a CSV file."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "ragged.csv")
+        with open(self.path, "w") as f:
+            f.write(TEXT)
+        with open(self.path, newline="") as f:
+            self.rows = list(csv.reader(f))
+
+    def check(self, dataset, rows):
+        """dataset holds rows, by index and by slice."""
+        self.assertEqual(len(dataset), len(rows))
+        self.assertEqual([dataset[i] for i in range(len(rows))], rows)
+        self.assertEqual(dataset[1:4], rows[1:4])
+        self.assertEqual(dataset[:], rows)
+
+    def test_encode(self):
+        """Rows encoded in this process."""
+        self.check(ColumnarDataset.encode(iter(self.rows)), self.rows)
+        self.check(ColumnarDataset.from_csv(self.path, 1), self.rows[1:])
+
+    def test_workers(self):
+        """Rows parsed by a pool of processes."""
+        self.check(ColumnarDataset.from_csv(self.path, 0, 2), self.rows)
+
+    def test_blank_rows(self):
+        """A file of blank rows only."""
+        rows = [[], [], []]
+        self.check(ColumnarDataset.encode(iter(rows)), rows)
+
+    def test_sidecar(self):
+        """Rows stored in a sidecar and mapped back."""
+        Sidecar.open(self.path, 0).columnar()
+        sidecar = Sidecar(self.path, 0)
+        self.assertTrue(sidecar.load())
+        self.check(sidecar.columnar(), self.rows)
+        self.check(sidecar.index(), self.rows)
+
+    def test_quoted_newlines(self):
+        """A CRLF inside a quoted field is kept by every storage."""
+        with open(self.path, "w", newline="") as f:
+            f.write('year,name\r\n2016,"Ol\r\nivia"\r\n2017,"Emma"\r\n')
+        rows = [["2016", "Ol\r\nivia"], ["2017", "Emma"]]
+        self.check(ColumnarDataset.from_csv(self.path, 1), rows)
+        self.check(ColumnarDataset.from_csv(self.path, 1, 2), rows)
+        self.check(Sidecar.open(self.path, 1).index(), rows)
+
+    def test_uniform_rows(self):
+        """Rows of the same length keep no lengths."""
+        dataset = ColumnarDataset.encode(iter([["1", "a"], ["2", "b"]]))
+        self.assertIsNone(dataset.lengths)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests of NameSearch.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from name_search import NameSearch  # noqa: E402
+from secondary_index import TableIndex  # noqa: E402
+
+HEADER = ["Year of Birth", "Gender", "Child's First Name"]
+NAMES = ["Olivia", "Oliver", "Emma", "Emily", "Ava", "Chloe", "Isabella",
+         "Sophia", "Mia", "Liam", "Noah", "Jacob", "Alexander", "Olive"]
+
+
+def search() -> NameSearch:
+    """A search over two rows of every name, header first."""
+    rows = [HEADER] + [[year, "FEMALE", name] for year in ("2016", "2017")
+                       for name in NAMES]
+    return NameSearch(TableIndex(rows, HEADER, first=1))
+
+
+class TestFuzzy(unittest.TestCase):
+    """A name with one typo finds the name first."""
+
+    def setUp(self):
+        """Index the names."""
+        self.search = search()
+
+    def first(self, query: str) -> str:
+        """The name a fuzzy search of query ranks first."""
+        ids = self.search.fuzzy(query)
+        self.assertTrue(ids, query)
+        return self.search.names[ids[0]]
+
+    def test_one_edit(self):
+        """Deletion, insertion, substitution and transposition."""
+        typos = {"Olvia": "Olivia", "Olivai": "Olivia", "Oliviaa": "Olivia",
+                 "Olivua": "Olivia", "Emna": "Emma", "Ema": "Emma",
+                 "Chloee": "Chloe", "Cloe": "Chloe", "Isabela": "Isabella",
+                 "Alexnader": "Alexander", "Jacbo": "Jacob",
+                 "Sophai": "Sophia"}
+        for typo, name in typos.items():
+            self.assertEqual(self.first(typo), name, typo)
+
+    def test_exact_first(self):
+        """The exact name comes before the names a typo away."""
+        self.assertEqual(self.first("olive"), "Olive")
+        self.assertEqual(self.first("Oliver"), "Oliver")
+
+    def test_unrelated(self):
+        """A query like no name finds none."""
+        self.assertEqual(self.search.fuzzy("Xyzzy"), [])
+
+    def test_positions(self):
+        """Rows of the names found, most alike first."""
+        positions, total = self.search.page("Olvia", "fuzzy", 1, 2)
+        self.assertEqual(total, len(self.search.positions("Olvia", "fuzzy")))
+        rows = self.search.index.rows
+        self.assertEqual([rows[i][2] for i in positions], ["Olivia"] * 2)
+
+
+class TestPrefixSubstring(unittest.TestCase):
+    """Exact searches are not changed by the padded n-grams."""
+
+    def test_prefix(self):
+        """Names starting with the query, any case."""
+        found = search()
+        names = {found.names[i] for i in found.prefix("oli")}
+        self.assertEqual(names, {"Olivia", "Oliver", "Olive"})
+
+    def test_substring(self):
+        """Names containing the query."""
+        found = search()
+        names = {found.names[i] for i in found.substring("li")}
+        self.assertEqual(names, {"Olivia", "Oliver", "Olive", "Liam"})
+        names = {found.names[i] for i in found.substring("ia")}
+        self.assertEqual(names, {"Olivia", "Sophia", "Mia", "Liam"})
+
+
+if __name__ == "__main__":
+    unittest.main()
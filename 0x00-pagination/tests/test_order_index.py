@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Tests of FenwickIndex, IndexedDataset and the index Server.
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from order_index import FenwickIndex, IndexedDataset  # noqa: E402
+
+IndexServer = __import__('3-hypermedia_del_pagination').Server
+
+
+class TestFenwickIndex(unittest.TestCase):
+    """The index agrees with a set of the live positions."""
+
+    def test_random(self):
+        """Random deletes and inserts, some growing the index."""
+        rng = random.Random(18)
+        index = FenwickIndex(50)
+        live = set(range(50))
+        for _ in range(3000):
+            position = rng.randrange(120)
+            if rng.random() < 0.6:
+                self.assertEqual(index.delete(position), position in live)
+                live.discard(position)
+            else:
+                self.assertEqual(index.insert(position),
+                                 position not in live)
+                live.add(position)
+            self.assertEqual(len(index), len(live))
+            ordered = sorted(live)
+            start = rng.randrange(130)
+            k = rng.randrange(12)
+            self.assertEqual(index.next(start, k),
+                             [p for p in ordered if p >= start][:k])
+            self.assertEqual(index.rank(start),
+                             len([p for p in ordered if p < start]))
+            if ordered:
+                i = rng.randrange(len(ordered))
+                self.assertEqual(index.select(i), ordered[i])
+
+    def test_empty(self):
+        """An index with no live position."""
+        index = FenwickIndex(10, live=False)
+        self.assertEqual(index.next(0, 5), [])
+        self.assertFalse(index.delete(3))
+        with self.assertRaises(IndexError):
+            index.select(0)
+        self.assertEqual(FenwickIndex().next(0, 5), [])
+
+    def test_long_gap(self):
+        """Positions on both sides of a long run of deleted ones."""
+        index = FenwickIndex(10000)
+        for position in range(5, 9995):
+            index.delete(position)
+        self.assertEqual(index.next(3, 4), [3, 4, 9995, 9996])
+        self.assertEqual(index.next(5, 2), [9995, 9996])
+        self.assertEqual(index.next(9999, 3), [9999])
+        self.assertEqual(index.next(10000, 3), [])
+
+
+class TestIndexedDataset(unittest.TestCase):
+    """Pages skip the deleted rows."""
+
+    def test_page(self):
+        """Deleted, set and appended keys."""
+        data = IndexedDataset([["row{}".format(i)] for i in range(10)])
+        for key in (2, 3, 7):
+            del data[key]
+        data[3] = ["new3"]
+        data[12] = ["row12"]
+        self.assertEqual(data.page(1, 4), [(1, ["row1"]), (3, ["new3"]),
+                                           (4, ["row4"]), (5, ["row5"])])
+        self.assertEqual(data.page(6, 10), [(6, ["row6"]), (8, ["row8"]),
+                                            (9, ["row9"]), (12, ["row12"])])
+        self.assertEqual(data.last(), 12)
+        self.assertEqual(len(data), 9)
+        with self.assertRaises(KeyError):
+            del data[7]
+
+
+class TestIndexServer(unittest.TestCase):
+    """get_hyper_index over deleted rows."""
+
+    def setUp(self):
+        """A Server of a CSV file of 20 rows."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "names.csv")
+        with open(path, "w") as f:
+            f.write("year,name,count\n")
+            for i in range(20):
+                f.write("2016,Name{},{}\n".format(i, i))
+        self.server = type("Server", (IndexServer,),
+                           {"DATA_FILE": path})()
+
+    def test_deleted_rows(self):
+        """Pages followed by next_index cover every live row once,
+        deletions made between two pages included."""
+        data = self.server.indexed_dataset()
+        for key in (0, 3, 4, 5, 11):
+            del data[key]
+        page = self.server.get_hyper_index(0, 4)
+        self.assertEqual(page["index"], 0)
+        self.assertEqual([row[1] for row in page["data"]],
+                         ["Name1", "Name2", "Name6", "Name7"])
+        self.assertEqual(page["next_index"], 8)
+        del data[9]
+        page = self.server.get_hyper_index(page["next_index"], 4)
+        self.assertEqual([row[1] for row in page["data"]],
+                         ["Name8", "Name10", "Name12", "Name13"])
+        page = self.server.get_hyper_index(page["next_index"], 10)
+        self.assertEqual([row[1] for row in page["data"]],
+                         ["Name14", "Name15", "Name16", "Name17",
+                          "Name18", "Name19"])
+        self.assertEqual(page["page_size"], 6)
+        self.assertIsNone(page["next_index"])
+
+    def test_out_of_range(self):
+        """An index past the last live row is refused."""
+        data = self.server.indexed_dataset()
+        del data[19]
+        with self.assertRaises(AssertionError):
+            self.server.get_hyper_index(19, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
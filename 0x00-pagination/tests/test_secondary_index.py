@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Tests of TableIndex keyset pagination.
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from secondary_index import TableIndex  # noqa: E402
+
+HEADER = ["Year of Birth", "Gender", "Child's First Name", "Count"]
+
+
+def dataset(size: int, seed: int = 0) -> list:
+    """A header then size rows with few distinct values, so sorts
+    have long runs of ties."""
+    rng = random.Random(seed)
+    return [HEADER] + [[rng.choice(["2016", "2017", "2018"]),
+                        rng.choice(["FEMALE", "MALE"]),
+                        rng.choice(["Olivia", "Emma", "Liam", "Noah"]),
+                        str(rng.randrange(8))]
+                       for _ in range(size)]
+
+
+def expected(rows: list, filters: dict, sort: str = None) -> list:
+    """Positions of the rows matching filters in sort order, by brute
+    force."""
+    positions = [i for i in range(1, len(rows))
+                 if all(rows[i][HEADER.index(name)] == value
+                        for name, value in filters.items())]
+    if sort is None:
+        return positions
+    column = HEADER.index(sort.lstrip("-"))
+    positions.sort(key=lambda i: (int(rows[i][column]) if
+                                  sort.endswith("Count") else
+                                  rows[i][column], i))
+    if sort.startswith("-"):
+        positions.reverse()
+    return positions
+
+
+class TestKeysetPages(unittest.TestCase):
+    """Pages walked with cursors cover the matching rows in order."""
+
+    def setUp(self):
+        """Index 200 rows."""
+        self.rows = dataset(200)
+        self.index = TableIndex(self.rows, HEADER, first=1)
+
+    def walk(self, filters: dict, sort: str, page_size: int) -> list:
+        """Every position of the pages of a query, checking each page
+        reports the total."""
+        positions = []
+        cursor = None
+        total = len(expected(self.rows, filters))
+        while True:
+            page, cursor, count = self.index.page(filters, sort, cursor,
+                                                  page_size)
+            self.assertEqual(count, total)
+            self.assertLessEqual(len(page), page_size)
+            positions.extend(page)
+            if cursor is None:
+                return positions
+
+    def test_ascending(self):
+        """Ascending sorts, with and without filters."""
+        for filters in ({}, {"Gender": "MALE"},
+                        {"Gender": "FEMALE", "Year of Birth": "2017"}):
+            for sort in (None, "Count", "Child's First Name"):
+                for page_size in (1, 7, 50, 500):
+                    self.assertEqual(self.walk(filters, sort, page_size),
+                                     expected(self.rows, filters, sort),
+                                     (filters, sort, page_size))
+
+    def test_descending_ties(self):
+        """Descending sorts by a column of eight values, pages ending
+        inside runs of tied values."""
+        for filters in ({}, {"Child's First Name": "Emma"}):
+            for sort in ("-Count", "-Year of Birth"):
+                for page_size in (1, 3, 10, 33):
+                    self.assertEqual(self.walk(filters, sort, page_size),
+                                     expected(self.rows, filters, sort),
+                                     (filters, sort, page_size))
+
+    def test_no_match(self):
+        """A filter matching no row gives an empty last page."""
+        self.assertEqual(self.index.page({"Gender": "OTHER"}, "-Count"),
+                         ([], None, 0))
+
+    def test_count_filters(self):
+        """count of two and three filters, with and without a kept view
+        of the same filters."""
+        for filters in ({"Gender": "MALE", "Year of Birth": "2016"},
+                        {"Gender": "FEMALE", "Child's First Name": "Liam",
+                         "Count": "3"}):
+            total = len(expected(self.rows, filters))
+            self.assertEqual(self.index.count(filters), total)
+            self.index.view(filters, "Count")
+            self.assertEqual(self.index.count(filters), total)
+        self.assertEqual(self.index.count({}), 200)
+
+    def test_foreign_cursor(self):
+        """A cursor only pages the query it came from."""
+        _, cursor, _ = self.index.page({"Gender": "MALE"}, "Count")
+        for filters, sort in (({"Gender": "FEMALE"}, "Count"),
+                              ({"Gender": "MALE"}, "-Count"),
+                              ({"Gender": "MALE"}, None)):
+            with self.assertRaises(ValueError):
+                self.index.page(filters, sort, cursor)
+        for cursor in ("not a cursor", "bm90IGpzb24="):
+            with self.assertRaises(ValueError):
+                self.index.page({}, None, cursor)
+
+
+class TestExtend(unittest.TestCase):
+    """Rows appended to the dataset are paged once indexed."""
+
+    def test_append(self):
+        """Postings, sort values and views include appended rows."""
+        rows = dataset(100)
+        index = TableIndex(rows, HEADER, first=1)
+        filters = {"Gender": "FEMALE"}
+        index.page(filters, "-Count")
+        index.count({"Gender": "MALE", "Year of Birth": "2016"})
+        rows = rows + dataset(50, seed=1)[1:]
+        index.extend(rows)
+        self.assertEqual(index.count(filters),
+                         len(expected(rows, filters)))
+        self.assertEqual(index.count({"Gender": "MALE",
+                                      "Year of Birth": "2016"}),
+                         len(expected(rows, {"Gender": "MALE",
+                                             "Year of Birth": "2016"})))
+        positions, _, _ = index.page(filters, "-Count", page_size=1000)
+        self.assertEqual(positions, expected(rows, filters, "-Count"))
+
+    def test_append_text_to_numbers(self):
+        """A column of integers getting some other value sorts as text
+        from then on."""
+        rows = dataset(20)
+        index = TableIndex(rows, HEADER, first=1)
+        index.page({}, "Count")
+        rows = rows + [["2019", "MALE", "Ava", "n/a"]]
+        index.extend(rows)
+        positions, _, _ = index.page({}, "Count", page_size=100)
+        order = sorted(range(1, len(rows)), key=lambda i: (rows[i][3], i))
+        self.assertEqual(positions, order)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Tests of the Sidecar shared by the Servers of a process.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from sidecar import Sidecar  # noqa: E402
+
+SimpleServer = __import__('1-simple_pagination').Server
+IndexServer = __import__('3-hypermedia_del_pagination').Server
+
+
+class TestAttach(unittest.TestCase):
+    """Servers attach to the sidecar of the current CSV file."""
+
+    def setUp(self):
+        """A CSV file of three rows."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "names.csv")
+        self.write(["2016,Olivia,172", "2016,Chloe,112", "2017,Emma,101"])
+
+    def write(self, rows):
+        """Replace the CSV file by a header and rows."""
+        with open(self.path, "w") as f:
+            f.write("year,name,count\n" + "\n".join(rows) + "\n")
+
+    def server(self, storage):
+        """A new Server of the CSV file."""
+        return type("Server", (SimpleServer,),
+                    {"DATA_FILE": self.path})(storage)
+
+    def test_shared(self):
+        """Servers of an unchanged file share one sidecar."""
+        self.assertIs(Sidecar.attach(self.path), Sidecar.attach(self.path))
+
+    def test_rewritten(self):
+        """A Server created after the file was rewritten serves the
+        new rows, not the old ones at the old offsets."""
+        for storage in ("mmap", "columnar"):
+            self.write(["2016,Olivia,172", "2016,Chloe,112"])
+            self.assertEqual(self.server(storage).get_page(1, 2)[1],
+                             ["2016", "Chloe", "112"])
+            self.write(["2013,Jayden,300", "2013,Mia,250", "2013,Ava,99"])
+            self.assertEqual(self.server(storage).get_page(1, 3),
+                             [["2013", "Jayden", "300"],
+                              ["2013", "Mia", "250"],
+                              ["2013", "Ava", "99"]], storage)
+
+    def test_index_server_workers(self):
+        """workers stays the first argument of the index Server."""
+        server = IndexServer(4)
+        self.assertEqual(server.workers, 4)
+        self.assertEqual(server.storage, "list")
+
+
+if __name__ == "__main__":
+    unittest.main()
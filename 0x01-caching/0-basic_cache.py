@@ -24,9 +24,24 @@ class BasicCache(BaseCaching):
             if key is None or item is None:
                 do_put = False
             else:
+                self.account(key, self.item_size(item))
                 self.cache_data[key] = item
                 do_put = False
 
+    def put_many(self, mapping):
+        """Store every key-value pair of mapping in the cache.
+
+        Args:
+            mapping (dict): the key-value pairs to be cached.
+
+        Returns:
+            None
+        """
+        for key, item in mapping.items():
+            if key is not None and item is not None:
+                self.account(key, self.item_size(item))
+                self.cache_data[key] = item
+
     def get(self, key):
         """Retrieve a value from the cache using its key.
 
@@ -40,6 +55,16 @@ class BasicCache(BaseCaching):
         do_get = True
         result = None
         while do_get:
-            result = self.cache_data.get(key, None)
+            result = self.stats.lookup(self.cache_data.get(key, None))
             do_get = False
         return result
+
+    def hit(self, key):
+        """Record a hit on a cached key, for get_many.
+
+        Args:
+            key (hashable): key found in the cache.
+
+        Returns:
+            None
+        """
@@ -10,12 +10,17 @@ class FIFOCache(BaseCaching):
     """This class represents a FIFO cache.
     It stores and retrieves items from a dictionary,
     removing the oldest items when the cache limit is reached.
+    Items are kept in insertion order in a STORE, an OrderedDict
+    unless a subclass picks e.g. linked_store.LinkedStore.
     """
-    def __init__(self):
+    STORE = OrderedDict
+
+    def __init__(self, *args, **kwargs):
         """Initialize the cache.
+        Arguments are the capacity settings of BaseCaching.
         """
-        super().__init__()
-        self.cache_data = OrderedDict()
+        super().__init__(*args, **kwargs)
+        self.cache_data = self.STORE()
 
     def put(self, key, item):
         """Add an item to the cache.
@@ -25,14 +30,33 @@ class FIFOCache(BaseCaching):
         if key is None or item is None:
             return
 
-        self.cache_data[key] = item
+        size = self.item_size(item)
+        if not self.make_room(key, size):
+            return
+        self.account(key, size)
+        self.store(key, item)
 
-        while len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            first_key, _ = self.cache_data.popitem(last=False)
-            print("DISCARD:", first_key)
+    def store(self, key, item):
+        """Store an item, a new key going last in insertion order.
+        """
+        self.cache_data[key] = item
 
     def get(self, key):
         """Retrieve an item from the cache by its key.
         If the key is not found, return None.
         """
-        return self.cache_data.get(key, None)
+        return self.stats.lookup(self.cache_data.get(key, None))
+
+    def hit(self, key):
+        """Record a hit for get_many: the insertion order is unchanged.
+        """
+
+    def victim(self):
+        """Return the oldest key, the next one to be removed.
+        """
+        return next(iter(self.cache_data))
+
+    def victims(self):
+        """Return the keys oldest first: new keys always come after.
+        """
+        return iter(self.cache_data)
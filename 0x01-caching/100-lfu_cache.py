@@ -9,45 +9,42 @@ class LFUCache(BaseCaching):
     """Represents an object that stores & retrieves items dictionary
     using the Least Frequently Used caching mechanism. When the cache
     limit is reached, the least frequently used item is removed.
+
+    Keys are kept in frequency buckets: `freq_buckets` maps a use count
+    to an OrderedDict of the keys having that count, oldest use first,
+    so ties between equally used keys are broken by recency (LRU).
+    Together with `min_freq` this makes `get`, `put` and eviction O(1).
     """
-    def __init__(self):
-        """Initialize the LFU cache."""
-        super().__init__()
-        self.cache_data = OrderedDict()
-        self.keys_freq = []
+    def __init__(self, *args, **kwargs):
+        """Initialize the LFU cache with the capacity settings
+        of BaseCaching."""
+        super().__init__(*args, **kwargs)
+        self.cache_data = {}
+        self.keys_freq = {}
+        self.freq_buckets = {}
+        self.min_freq = 0
+
+    def __touch(self, key, freq):
+        """Append key at the most recent end of the bucket for freq."""
+        bucket = self.freq_buckets.get(freq)
+        if bucket is None:
+            bucket = self.freq_buckets[freq] = OrderedDict()
+        bucket[key] = None
+        self.keys_freq[key] = freq
 
     def __reorder_items(self, mru_key):
-        """Reorder the items in cache based on the most recently used key.
-        Update the frequency count of MRU key & reposition keys_freq list.
+        """Move the most recently used key to the next frequency bucket.
+        Drop its old bucket if it is now empty and bump min_freq if
+        that bucket held the least frequently used keys.
         """
-        max_positions = []
-        mru_freq = 0
-        mru_pos = 0
-        ins_pos = 0
-        i = 0
-        do_continue = True
-        while do_continue:
-            if i < len(self.keys_freq):
-                key_freq = self.keys_freq[i]
-                if key_freq[0] == mru_key:
-                    mru_freq = key_freq[1] + 1
-                    mru_pos = i
-                    do_continue = False
-                elif len(max_positions) == 0:
-                    max_positions.append(i)
-                elif key_freq[1] < self.keys_freq[max_positions[-1]][1]:
-                    max_positions.append(i)
-            else:
-                do_continue = False
-            i += 1
-
-        max_positions.reverse()
-        for pos in max_positions:
-            if self.keys_freq[pos][1] > mru_freq:
-                break
-            ins_pos = pos
-        self.keys_freq.pop(mru_pos)
-        self.keys_freq.insert(ins_pos, [mru_key, mru_freq])
+        freq = self.keys_freq[mru_key]
+        bucket = self.freq_buckets[freq]
+        del bucket[mru_key]
+        if not bucket:
+            del self.freq_buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.__touch(mru_key, freq + 1)
 
     def put(self, key, item):
         """Add an item to the cache.
@@ -56,26 +53,19 @@ class LFUCache(BaseCaching):
         """
         if key is None or item is None:
             return
+        size = self.item_size(item)
+        if not self.make_room(key, size):
+            return
+        self.account(key, size)
+        self.store(key, item)
+
+    def store(self, key, item):
+        """Store an item, a new key starting at frequency 0 and a
+        cached one moving to the next frequency."""
         if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                lfu_key, _ = self.keys_freq[-1]
-                self.cache_data.pop(lfu_key)
-                self.keys_freq.pop()
-                print("DISCARD:", lfu_key)
             self.cache_data[key] = item
-            ins_index = len(self.keys_freq)
-            i = 0
-            do_continue = True
-            while do_continue:
-                if i < len(self.keys_freq):
-                    key_freq = self.keys_freq[i]
-                    if key_freq[1] == 0:
-                        ins_index = i
-                        do_continue = False
-                else:
-                    do_continue = False
-                i += 1
-            self.keys_freq.insert(ins_index, [key, 0])
+            self.__touch(key, 0)
+            self.min_freq = 0
         else:
             self.cache_data[key] = item
             self.__reorder_items(key)
@@ -86,4 +76,43 @@ class LFUCache(BaseCaching):
         """
         if key is not None and key in self.cache_data:
             self.__reorder_items(key)
-        return self.cache_data.get(key, None)
+        return self.stats.lookup(self.cache_data.get(key, None))
+
+    def hit(self, key):
+        """Count a use of a key found by get_many."""
+        self.__reorder_items(key)
+
+    def pop(self, key):
+        """Remove key from the cache and from its frequency bucket."""
+        freq = self.keys_freq.pop(key, None)
+        if freq is not None:
+            bucket = self.freq_buckets[freq]
+            del bucket[key]
+            if not bucket:
+                del self.freq_buckets[freq]
+        return super().pop(key)
+
+    def snapshot_entries(self):
+        """Yield the entries bucket by bucket, lowest frequency first,
+        with their frequency as metadata."""
+        for freq in sorted(self.freq_buckets):
+            for key in self.freq_buckets[freq]:
+                yield key, self.cache_data[key], freq
+
+    def restore_entry(self, key, item, meta):
+        """Reload an entry at the end of the bucket of its frequency."""
+        super().restore_entry(key, item, meta)
+        self.__touch(key, meta)
+        if len(self.cache_data) == 1 or meta < self.min_freq:
+            self.min_freq = meta
+
+    def victim(self):
+        """Return the least recently used key of the lowest frequency."""
+        if self.min_freq not in self.freq_buckets:
+            self.min_freq = min(self.freq_buckets)
+        return next(iter(self.freq_buckets[self.min_freq]))
+
+    def victims(self):
+        """Return the keys used 0 times, oldest first: a new key starts
+        at frequency 0 after them and a cached key put moves up."""
+        return iter(self.freq_buckets.get(0, ()))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Thread-safe sharded cache module.
+
+Keys are hashed over several independently locked instances of one of
+the caching policies, so threads working on different shards never
+wait for each other. Running this file prints a contention benchmark
+against a single policy instance behind one global lock.
+
+On an interpreter with a GIL the policies' pure Python code still runs
+one thread at a time, so the benchmark mostly shows the sharded cache
+does not convoy on one lock; throughput grows with the thread count on
+free-threaded builds, where the shards really run in parallel.
+"""
+import threading
+import time
+
+from base_caching import CacheStats
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+class ShardedCache():
+    """A cache spreading its keys over `shards` policy instances,
+    each one guarded by its own lock.
+
+    The item count and byte budget are split evenly between the
+    shards, so each shard evicts on its own following its policy.
+    """
+    def __init__(self, policy=LRUCache, shards=8, max_items=None,
+                 max_bytes=None, sizeof=None):
+        """Initialize the shards.
+
+        Args:
+            policy (type): BaseCaching subclass used for every shard.
+            shards (int): number of independent shards.
+            max_items (int): total item count, split over the shards.
+            max_bytes (int): total byte budget, split over the shards.
+            sizeof (callable): size estimator given to every shard.
+        """
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+        if max_items is not None:
+            max_items = -(-max_items // shards)
+        if max_bytes is not None:
+            max_bytes = max_bytes // shards
+        self.shards = [policy(max_items, max_bytes, sizeof)
+                       for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+
+    def shard_index(self, key):
+        """Return the index of the shard holding key."""
+        return hash(key) % len(self.shards)
+
+    def put(self, key, item):
+        """Add an item to the shard owning key."""
+        if key is None or item is None:
+            return
+        i = self.shard_index(key)
+        with self.locks[i]:
+            self.shards[i].put(key, item)
+
+    def get(self, key):
+        """Retrieve an item from the shard owning key."""
+        if key is None:
+            return None
+        i = self.shard_index(key)
+        with self.locks[i]:
+            return self.shards[i].get(key)
+
+    def get_many(self, keys):
+        """Retrieve the items of the keys found in the cache as a dict,
+        locking every shard once for all its keys."""
+        groups = {}
+        for key in keys:
+            if key is not None:
+                groups.setdefault(self.shard_index(key), []).append(key)
+        found = {}
+        for i, group in groups.items():
+            with self.locks[i]:
+                found.update(self.shards[i].get_many(group))
+        return found
+
+    def put_many(self, mapping):
+        """Add the items of mapping, locking every shard once for all
+        its keys."""
+        groups = {}
+        for key, item in mapping.items():
+            if key is not None and item is not None:
+                groups.setdefault(self.shard_index(key), {})[key] = item
+        for i, group in groups.items():
+            with self.locks[i]:
+                self.shards[i].put_many(group)
+
+    def pop(self, key):
+        """Remove key from its shard and return its item."""
+        i = self.shard_index(key)
+        with self.locks[i]:
+            return self.shards[i].pop(key)
+
+    def discard(self, key, reason="capacity"):
+        """Evict key from its shard and tell the eviction listeners."""
+        i = self.shard_index(key)
+        with self.locks[i]:
+            self.shards[i].discard(key, reason)
+
+    def on_evict(self, listener):
+        """Register an eviction listener on every shard.
+        It is called with the lock of the evicting shard held.
+        """
+        for shard in self.shards:
+            shard.on_evict(listener)
+        return listener
+
+    @property
+    def stats(self):
+        """Counters of all the shards added together."""
+        stats = CacheStats()
+        for shard in self.shards:
+            stats.add(shard.stats)
+        return stats
+
+    def print_cache(self):
+        """Print the content of every shard as a single cache."""
+        cache_data = {}
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                cache_data.update(shard.cache_data)
+        print("Current cache:")
+        for key in sorted(cache_data.keys()):
+            print("{}: {}".format(key, cache_data.get(key)))
+
+
+class LockedCache():
+    """A single policy instance behind one global lock, the baseline
+    the sharded cache is measured against.
+    """
+    def __init__(self, policy=LRUCache, max_items=None, max_bytes=None,
+                 sizeof=None):
+        """Initialize the cache and its lock."""
+        self.cache = policy(max_items, max_bytes, sizeof)
+        self.lock = threading.Lock()
+
+    def put(self, key, item):
+        """Add an item under the global lock."""
+        with self.lock:
+            self.cache.put(key, item)
+
+    def get(self, key):
+        """Retrieve an item under the global lock."""
+        with self.lock:
+            return self.cache.get(key)
+
+
+def benchmark(cache, threads, ops=20000, keys=1024):
+    """Hammer cache from several threads and return the throughput.
+
+    Every thread runs ops operations, one put for every three gets,
+    over a key space of `keys` integers.
+
+    Returns:
+        float: operations per second over all threads.
+    """
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        """Run the operation mix of one thread."""
+        barrier.wait()
+        key = seed
+        for i in range(ops):
+            key = (key * 1103515245 + 12345) % keys
+            if i % 4 == 0:
+                cache.put(key, i)
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=worker, args=(n,))
+               for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    policies = [
+        __import__('1-fifo_cache').FIFOCache,
+        LRUCache,
+        __import__('100-lfu_cache').LFUCache,
+    ]
+    print("{:<14}{:>8}{:>14}{:>14}".format(
+        "policy", "threads", "global ops/s", "sharded ops/s"))
+    for policy in policies:
+        for threads in (1, 2, 4, 8, 16):
+            locked = LockedCache(policy, max_items=2048)
+            sharded = ShardedCache(policy, shards=16, max_items=2048)
+            print("{:<14}{:>8}{:>14.0f}{:>14.0f}".format(
+                policy.__name__, threads,
+                benchmark(locked, threads), benchmark(sharded, threads)))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Time To Live (TTL) cache module.
+
+Adds per-entry and default expiry to any of the caching policies.
+Expired entries are dropped lazily when they are looked up, and a
+hierarchical timer wheel reaps the others without ever scanning the
+cache data.
+"""
+import math
+import time
+
+
+class TimerWheel():
+    """Hierarchical timer wheel scheduling keys by deadline.
+
+    Time is cut in ticks of `resolution` seconds. Level 0 holds one
+    slot per tick for the next 2 ** bits ticks, and each level above
+    covers 2 ** bits slots of the level below it, so `levels` levels
+    reach 2 ** (bits * levels) ticks ahead. Entries trickle down one
+    level at a time as the wheel turns, which keeps both scheduling
+    and reaping amortised O(1) per entry.
+    """
+    def __init__(self, resolution=1.0, bits=6, levels=4, now=0.0):
+        """Initialize empty wheels starting at time now."""
+        self.resolution = resolution
+        self.bits = bits
+        self.levels = levels
+        self.mask = (1 << bits) - 1
+        self.wheels = [[[] for _ in range(1 << bits)]
+                       for _ in range(levels)]
+        self.tick = math.floor(now / resolution)
+        self.count = 0
+
+    def __place(self, key, deadline, tick):
+        """Put an entry in the slot of the lowest level able to hold it.
+        Deadlines beyond the span of the wheel are parked at its last
+        tick, in the top level slot it wraps to, and placed again when
+        that slot cascades; with a single level they come out of the
+        wheel early instead.
+        """
+        tick = min(tick, self.tick + (1 << self.bits * self.levels) - 1)
+        for level in range(self.levels):
+            shift = self.bits * (level + 1)
+            if tick >> shift == self.tick >> shift:
+                break
+        slot = (tick >> (self.bits * level)) & self.mask
+        self.wheels[level][slot].append((key, deadline))
+
+    def schedule(self, key, deadline):
+        """Schedule key to come out of the wheel at deadline."""
+        tick = max(math.ceil(deadline / self.resolution), self.tick + 1)
+        self.__place(key, deadline, tick)
+        self.count += 1
+
+    def advance(self, now):
+        """Turn the wheel up to time now.
+
+        Returns:
+            list: (key, deadline) pairs whose tick has been reached.
+            A deadline may still be in the future for entries parked
+            beyond a single level; they must be scheduled again.
+        """
+        target = math.floor(now / self.resolution)
+        due = []
+        while self.tick < target and self.count:
+            self.tick += 1
+            level = 1
+            while (level < self.levels and
+                   not self.tick & ((1 << (self.bits * level)) - 1)):
+                level += 1
+            for upper in range(level - 1, 0, -1):
+                slot = (self.tick >> (self.bits * upper)) & self.mask
+                entries = self.wheels[upper][slot]
+                self.wheels[upper][slot] = []
+                for key, deadline in entries:
+                    tick = math.ceil(deadline / self.resolution)
+                    self.__place(key, deadline, max(tick, self.tick))
+            slot = self.tick & self.mask
+            if self.wheels[0][slot]:
+                due.extend(self.wheels[0][slot])
+                self.count -= len(self.wheels[0][slot])
+                self.wheels[0][slot] = []
+        self.tick = max(self.tick, target)
+        return due
+
+
+class TTLCache():
+    """Wraps a cache so its entries expire after a time to live.
+
+    Any object with the `put`, `get`, `pop`, `discard` and `on_evict`
+    methods of BaseCaching can be wrapped, so expiry composes with
+    every eviction policy: the wrapped cache still evicts on capacity,
+    and expired entries are removed from it as soon as they are seen
+    or reaped.
+    """
+    def __init__(self, cache, ttl=None, resolution=1.0,
+                 clock=time.monotonic):
+        """Initialize the TTL cache.
+
+        Args:
+            cache (BaseCaching): cache holding the entries.
+            ttl (float): default time to live in seconds, None for
+                entries that never expire.
+            resolution (float): granularity of the reaping wheel in
+                seconds; lookups always honour exact deadlines.
+            clock (callable): returns the current time in seconds.
+        """
+        self.cache = cache
+        self.ttl = ttl
+        self.clock = clock
+        self.expires = {}
+        self.wheel = TimerWheel(resolution, now=clock())
+        cache.on_evict(self.__forget)
+
+    def __forget(self, key, item, reason):
+        """Drop the deadline of a key the wrapped cache evicted."""
+        self.expires.pop(key, None)
+
+    def reap(self, now=None):
+        """Remove every entry the wheel reports as expired.
+
+        Returns:
+            int: number of entries removed.
+        """
+        if now is None:
+            now = self.clock()
+        reaped = 0
+        for key, deadline in self.wheel.advance(now):
+            if self.expires.get(key) != deadline:
+                continue
+            if deadline > now:
+                self.wheel.schedule(key, deadline)
+                continue
+            self.cache.discard(key, "expired")
+            reaped += 1
+        return reaped
+
+    def put(self, key, item, ttl=None):
+        """Add an item to the cache, expiring after ttl seconds or
+        after the default time to live when ttl is None.
+        """
+        if key is None or item is None:
+            return
+        now = self.clock()
+        self.reap(now)
+        self.cache.put(key, item)
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is None or key not in self.cache.cache_data:
+            # no deadline, or the item was too big or not admitted
+            self.expires.pop(key, None)
+            return
+        deadline = now + ttl
+        self.expires[key] = deadline
+        self.wheel.schedule(key, deadline)
+
+    def get(self, key):
+        """Retrieve an item from the cache.
+        Return None if the key is missing or its entry has expired.
+        """
+        if key is None:
+            return None
+        now = self.clock()
+        self.reap(now)
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= now:
+            self.cache.discard(key, "expired")
+        return self.cache.get(key)
+
+    def pop(self, key):
+        """Remove key from the cache and return its item."""
+        self.expires.pop(key, None)
+        return self.cache.pop(key)
+
+    def print_cache(self):
+        """Print the entries of the wrapped cache."""
+        self.cache.print_cache()
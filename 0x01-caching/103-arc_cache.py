@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Adaptive Replacement Cache (ARC) module."""
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class ARCCache(BaseCaching):
+    """Cache balancing recency and frequency with the ARC policy.
+
+    Keys seen once live in `t1` and keys seen at least twice in `t2`,
+    both kept least recently used first. Evicted keys are remembered
+    without their item in the ghost lists `b1` and `b2`; a miss on a
+    ghost moves the target size `p` of `t1` towards the list that
+    would have kept it. A scan only ever fills `t1`, so it cannot
+    flush the frequently used keys of `t2`.
+    """
+    def __init__(self, *args, **kwargs):
+        """Initialize the ARC cache with the capacity settings
+        of BaseCaching."""
+        super().__init__(*args, **kwargs)
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.p = 0
+        self.__from_b2 = False
+
+    def __capacity(self):
+        """Return the item count the lists are balanced against."""
+        if self.max_items is not None:
+            return self.max_items
+        return max(len(self.cache_data), 1)
+
+    def __trim_ghosts(self):
+        """Forget the oldest ghosts so that t1 and b1 hold at most c
+        keys and all four lists at most 2c keys.
+        """
+        c = self.__capacity()
+        while self.b1 and len(self.t1) + len(self.b1) > c:
+            self.b1.popitem(last=False)
+        while self.b2 and (len(self.t1) + len(self.t2) +
+                           len(self.b1) + len(self.b2)) > 2 * c:
+            self.b2.popitem(last=False)
+
+    def put(self, key, item):
+        """Add an item to the cache.
+        A key found in a ghost list adapts `p` and comes back in t2,
+        any other new key goes to t1.
+        """
+        if key is None or item is None:
+            return
+        size = self.item_size(item)
+        self.__from_b2 = False
+        if key in self.cache_data:
+            target = self.t2
+        elif key in self.b1:
+            delta = max(len(self.b2) // len(self.b1), 1)
+            self.p = min(self.__capacity(), self.p + delta)
+            del self.b1[key]
+            target = self.t2
+        elif key in self.b2:
+            delta = max(len(self.b1) // len(self.b2), 1)
+            self.p = max(0, self.p - delta)
+            del self.b2[key]
+            self.__from_b2 = True
+            target = self.t2
+        else:
+            target = self.t1
+        if not self.make_room(key, size):
+            return
+        self.account(key, size)
+        self.cache_data[key] = item
+        for keys in (self.t1, self.t2, self.b1, self.b2):
+            keys.pop(key, None)
+        target[key] = None
+        self.__trim_ghosts()
+
+    def get(self, key):
+        """Retrieve an item from the cache by key.
+        A hit moves the key to the most recent end of t2.
+        """
+        if key is not None and key in self.cache_data:
+            if key in self.t1:
+                del self.t1[key]
+                self.t2[key] = None
+            else:
+                self.t2.move_to_end(key)
+        return self.stats.lookup(self.cache_data.get(key, None))
+
+    def pop(self, key):
+        """Remove key from the cache and from t1 or t2."""
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+        return super().pop(key)
+
+    def discard(self, key, reason="capacity"):
+        """Evict key, remembering it in the ghost list of its list
+        when it is evicted for capacity.
+        """
+        if reason == "capacity":
+            if key in self.t1:
+                self.b1[key] = None
+            elif key in self.t2:
+                self.b2[key] = None
+        super().discard(key, reason)
+
+    def snapshot_state(self):
+        """Return the target size of t1 and the ghost lists."""
+        return self.p, list(self.b1), list(self.b2)
+
+    def restore_state(self, state):
+        """Reload the target size of t1 and the ghost lists."""
+        p, b1, b2 = state
+        self.p = p
+        self.b1 = OrderedDict.fromkeys(b1)
+        self.b2 = OrderedDict.fromkeys(b2)
+
+    def snapshot_entries(self):
+        """Yield the entries of t1 then of t2, with 1 or 2 as metadata."""
+        for meta, keys in ((1, self.t1), (2, self.t2)):
+            for key in keys:
+                yield key, self.cache_data[key], meta
+
+    def restore_entry(self, key, item, meta):
+        """Reload an entry at the most recent end of t1 or t2."""
+        super().restore_entry(key, item, meta)
+        (self.t1 if meta == 1 else self.t2)[key] = None
+
+    def victim(self):
+        """Return the least recently used key of t1 when t1 is over
+        its target size, else the least recently used key of t2.
+        """
+        if self.t1 and (not self.t2 or len(self.t1) > self.p or
+                        (self.__from_b2 and len(self.t1) == self.p)):
+            return next(iter(self.t1))
+        return next(iter(self.t2))
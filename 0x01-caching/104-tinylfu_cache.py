@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Window TinyLFU (W-TinyLFU) Cache Module."""
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class CountMinSketch():
+    """Approximate access counts in a few small arrays of counters.
+
+    Every key increments one counter per row and its estimate is the
+    smallest of them. Counters saturate at 15, and once `sample_size`
+    increments have been made all of them are halved so that old
+    popularity fades away.
+    """
+    ROWS = 4
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+             0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+
+    def __init__(self, capacity, sample_factor=10):
+        """Initialize a sketch sized for capacity keys."""
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self.mask = width - 1
+        self.rows = [bytearray(width) for _ in range(self.ROWS)]
+        self.sample_size = sample_factor * max(capacity, 1)
+        self.samples = 0
+
+    def __indexes(self, key):
+        """Return the counter index of key in every row."""
+        h = hash(key)
+        return [((h * seed) >> 32) & self.mask for seed in self.SEEDS]
+
+    def increment(self, key):
+        """Count one more access to key."""
+        for row, i in zip(self.rows, self.__indexes(key)):
+            if row[i] < 15:
+                row[i] += 1
+        self.samples += 1
+        if self.samples >= self.sample_size:
+            self.reset()
+
+    def estimate(self, key):
+        """Return the estimated access count of key."""
+        indexes = self.__indexes(key)
+        return min(row[i] for row, i in zip(self.rows, indexes))
+
+    def reset(self):
+        """Halve every counter, aging the whole sketch."""
+        halve = bytes(n >> 1 for n in range(256))
+        for row in self.rows:
+            row[:] = row.translate(halve)
+        self.samples //= 2
+
+
+class TinyLFUCache(BaseCaching):
+    """Cache admitting new keys by estimated frequency (W-TinyLFU).
+
+    New keys enter a small LRU `window`. A key pushed out of the window
+    only enters the main space if the sketch says it is used more
+    often than the key the main space would evict, so scans and one
+    hit wonders cannot flush the popular keys. The main space is a
+    segmented LRU: keys hit again move from `probation` to `protected`.
+    Segments are sized by item count, so max_items is required.
+    """
+    WINDOW_SHARE = 0.01
+    PROTECTED_SHARE = 0.8
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the W-TinyLFU cache with the capacity settings
+        of BaseCaching."""
+        super().__init__(*args, **kwargs)
+        if self.max_items is None or self.max_items < 1:
+            raise ValueError("TinyLFUCache needs max_items of at least 1")
+        self.window_size = max(1, int(self.max_items * self.WINDOW_SHARE))
+        main_size = max(self.max_items - self.window_size, 1)
+        self.protected_size = int(main_size * self.PROTECTED_SHARE)
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(self.max_items)
+
+    def __admit(self, candidate):
+        """Move the oldest window key to probation, if the sketch rates
+        it above the key the main space would evict.
+        """
+        del self.window[candidate]
+        main_size = len(self.probation) + len(self.protected)
+        # an empty main space, as with max_items=1, has no key to duel
+        if not main_size or main_size + self.window_size < self.max_items:
+            self.probation[candidate] = None
+            return
+        if self.probation:
+            main_victim = next(iter(self.probation))
+        else:
+            main_victim = next(iter(self.protected))
+        estimate = self.sketch.estimate
+        if estimate(candidate) > estimate(main_victim):
+            self.discard(main_victim)
+            self.probation[candidate] = None
+        else:
+            self.discard(candidate)
+
+    def __promote(self, key):
+        """Move a probation key to protected, demoting the oldest
+        protected key back to probation when protected is full.
+        """
+        del self.probation[key]
+        self.protected[key] = None
+        if len(self.protected) > self.protected_size:
+            demoted, _ = self.protected.popitem(last=False)
+            self.probation[demoted] = None
+
+    def __touch(self, key):
+        """Record a hit on a cached key in its segment."""
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            self.__promote(key)
+        else:
+            self.protected.move_to_end(key)
+
+    def put(self, key, item):
+        """Add an item to the cache.
+        A new key enters the window; the window key it pushes out has
+        to win the frequency duel to stay in the cache.
+        """
+        if key is None or item is None:
+            return
+        self.sketch.increment(key)
+        size = self.item_size(item)
+        if key in self.cache_data:
+            self.__touch(key)
+        elif len(self.window) >= self.window_size:
+            self.__admit(next(iter(self.window)))
+        if not self.make_room(key, size):
+            return
+        if key not in self.cache_data:
+            self.window[key] = None
+        self.account(key, size)
+        self.cache_data[key] = item
+
+    def get(self, key):
+        """Retrieve an item from the cache by key.
+        Count the access in the sketch and refresh the key's segment.
+        """
+        if key is None:
+            return self.stats.lookup(None)
+        self.sketch.increment(key)
+        if key in self.cache_data:
+            self.__touch(key)
+        return self.stats.lookup(self.cache_data.get(key, None))
+
+    def pop(self, key):
+        """Remove key from the cache and from its segment."""
+        for segment in (self.window, self.probation, self.protected):
+            segment.pop(key, None)
+        return super().pop(key)
+
+    def snapshot_state(self):
+        """Return the counters of the frequency sketch."""
+        return [bytes(row) for row in self.sketch.rows], self.sketch.samples
+
+    def restore_state(self, state):
+        """Reload the counters of the frequency sketch, if it has the
+        same width as this cache's sketch."""
+        rows, samples = state
+        if len(rows[0]) == len(self.sketch.rows[0]):
+            self.sketch.rows = [bytearray(row) for row in rows]
+            self.sketch.samples = samples
+
+    def snapshot_entries(self):
+        """Yield the entries segment by segment, oldest first, with the
+        index of their segment as metadata."""
+        segments = (self.window, self.probation, self.protected)
+        for meta, segment in enumerate(segments):
+            for key in segment:
+                yield key, self.cache_data[key], meta
+
+    def restore_entry(self, key, item, meta):
+        """Reload an entry at the most recent end of its segment."""
+        super().restore_entry(key, item, meta)
+        (self.window, self.probation, self.protected)[meta][key] = None
+
+    def victim(self):
+        """Return the oldest key of probation, then of the window and
+        last of protected.
+        """
+        for segment in (self.probation, self.window, self.protected):
+            if segment:
+                return next(iter(segment))
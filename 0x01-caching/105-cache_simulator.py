@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Trace-replay simulator comparing the caching policies.
+
+Key traces, either synthetic or read from a file, are replayed
+through every policy at several capacities: a miss is followed by a
+put, as a read-through cache would do. For each run the hit ratio,
+the throughput and the peak memory are reported as a table or CSV.
+
+Usage: python3 105-cache_simulator.py [-t zipf|scan|loop|mixed|FILE]...
+           [-c CAPACITY]... [-p POLICY]... [-n LENGTH] [--csv FILE]
+"""
+import argparse
+import csv
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+
+POLICIES = {
+    "FIFO": __import__('1-fifo_cache').FIFOCache,
+    "LIFO": __import__('2-lifo_cache').LIFOCache,
+    "LRU": __import__('3-lru_cache').LRUCache,
+    "MRU": __import__('4-mru_cache').MRUCache,
+    "LFU": __import__('100-lfu_cache').LFUCache,
+    "ARC": __import__('103-arc_cache').ARCCache,
+    "TinyLFU": __import__('104-tinylfu_cache').TinyLFUCache,
+}
+FIELDS = ["trace", "policy", "capacity", "requests",
+          "hit_ratio", "ops_per_sec", "peak_bytes"]
+
+
+def zipf_trace(length, keys=10000, skew=1.0, seed=0):
+    """Return length keys drawn from range(keys) with a Zipf law,
+    key k having a weight of 1 / (k + 1) ** skew.
+    """
+    rand = random.Random(seed)
+    weights = itertools.accumulate(1 / (k + 1) ** skew for k in range(keys))
+    return rand.choices(range(keys), cum_weights=list(weights), k=length)
+
+
+def scan_trace(length, start=0):
+    """Return length distinct keys in a row, each one seen once."""
+    return list(range(start, start + length))
+
+
+def loop_trace(length, keys=1000):
+    """Return length keys looping over range(keys)."""
+    return [i % keys for i in range(length)]
+
+
+def mixed_trace(length, keys=10000, seed=0):
+    """Return a Zipf trace with a one-off scan key after every key."""
+    hot = zipf_trace(length // 2, keys, seed=seed)
+    scan = scan_trace(length - len(hot), start=keys)
+    return [key for pair in itertools.zip_longest(hot, scan)
+            for key in pair if key is not None]
+
+
+def load_trace(path):
+    """Read a recorded trace, the first field of each line being a key.
+    Blank lines and lines starting with # are skipped.
+    """
+    trace = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if fields and not fields[0].startswith("#"):
+                trace.append(fields[0])
+    return trace
+
+
+def replay(cache, trace):
+    """Run trace through cache, putting every missed key."""
+    get = cache.get
+    put = cache.put
+    for key in trace:
+        if get(key) is None:
+            put(key, key)
+
+
+def simulate(policy, trace, capacity):
+    """Replay trace through a new policy instance of capacity items.
+
+    The trace is replayed twice: once timed, and once under
+    tracemalloc to measure the peak memory the cache allocates.
+
+    Returns:
+        dict: hit ratio, operations per second and peak bytes.
+    """
+    cache = policy(max_items=capacity)
+    start = time.perf_counter()
+    replay(cache, trace)
+    elapsed = time.perf_counter() - start
+    ops = cache.stats.hits + cache.stats.misses + cache.stats.inserts
+    tracemalloc.start()
+    replay(policy(max_items=capacity), trace)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "requests": len(trace),
+        "hit_ratio": cache.stats.hit_ratio,
+        "ops_per_sec": ops / elapsed if elapsed else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def run(traces, capacities, policies=POLICIES):
+    """Simulate every policy on every trace at every capacity.
+
+    Args:
+        traces (dict): trace name to list of keys.
+        capacities (list): item counts to size the caches with.
+        policies (dict): policy name to BaseCaching subclass.
+
+    Returns:
+        list: one dict per run, with the keys of FIELDS.
+    """
+    rows = []
+    for name, trace in traces.items():
+        for capacity in capacities:
+            for policy_name, policy in policies.items():
+                row = {"trace": name, "policy": policy_name,
+                       "capacity": capacity}
+                row.update(simulate(policy, trace, capacity))
+                rows.append(row)
+    return rows
+
+
+def print_table(rows, file=sys.stdout):
+    """Print the simulation rows as an aligned table."""
+    line = "{:<16}{:<9}{:>9}{:>10}{:>10}{:>13}{:>12}"
+    print(line.format("trace", "policy", "capacity", "requests",
+                      "hit ratio", "ops/s", "peak KiB"), file=file)
+    for row in rows:
+        print(line.format(row["trace"][:15], row["policy"], row["capacity"],
+                          row["requests"], "{:.4f}".format(row["hit_ratio"]),
+                          "{:.0f}".format(row["ops_per_sec"]),
+                          "{:.1f}".format(row["peak_bytes"] / 1024)),
+              file=file)
+
+
+def write_csv(rows, file):
+    """Write the simulation rows as CSV to an open file."""
+    writer = csv.DictWriter(file, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def build_traces(names, length):
+    """Return the traces named on the command line, by name."""
+    synthetic = {
+        "zipf": lambda: zipf_trace(length),
+        "scan": lambda: scan_trace(length),
+        "loop": lambda: loop_trace(length),
+        "mixed": lambda: mixed_trace(length),
+    }
+    traces = {}
+    for name in names:
+        if name in synthetic:
+            traces[name] = synthetic[name]()
+        else:
+            traces[name] = load_trace(name)
+    return traces
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-t", "--trace", action="append",
+                        help="zipf, scan, loop, mixed or a trace file")
+    parser.add_argument("-c", "--capacity", action="append", type=int,
+                        help="cache capacity in items")
+    parser.add_argument("-n", "--length", type=int, default=100000,
+                        help="length of the synthetic traces")
+    parser.add_argument("-p", "--policy", action="append",
+                        choices=sorted(POLICIES), help="policies to run")
+    parser.add_argument("--csv", help="also write the results to FILE")
+    args = parser.parse_args()
+    traces = build_traces(args.trace or ["zipf", "scan", "loop", "mixed"],
+                          args.length)
+    policies = {name: POLICIES[name] for name in args.policy or POLICIES}
+    rows = run(traces, args.capacity or [100, 1000], policies)
+    print_table(rows)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            write_csv(rows, f)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Memoization decorator backed by the caching policies.
+
+`cached` turns any of the policies into a function cache for plain
+and `async def` functions. Concurrent calls missing the same key are
+coalesced (single-flight): only the first one runs the function while
+the others wait for its result, so a miss never stampedes the backend.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+
+LRUCache = __import__('3-lru_cache').LRUCache
+TTLCache = __import__('102-ttl_cache').TTLCache
+
+NONE = object()
+KWARGS_MARK = object()
+
+
+def make_key(args, kwargs, typed=False):
+    """Build a hashable cache key from the arguments of a call.
+
+    Keyword arguments are sorted so their order does not matter, and
+    with typed set 1 and 1.0 give different keys.
+    """
+    key = args
+    if kwargs:
+        key += (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    if typed:
+        key += tuple(type(arg) for arg in args)
+        key += tuple(type(value) for _, value in sorted(kwargs.items()))
+    if len(key) == 1 and type(key[0]) in (int, str):
+        return key[0]
+    return key
+
+
+class Flight():
+    """A call in progress that other callers of the same key wait for.
+    """
+    def __init__(self):
+        """Initialize a flight with no result yet."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """Wait for the leading call and return or raise its outcome."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def cached(policy=LRUCache, maxsize=128, ttl=None, typed=False,
+           key=make_key):
+    """Decorator caching the results of a function in a policy.
+
+    Args:
+        policy (type): BaseCaching subclass holding the results.
+        maxsize (int): most results kept.
+        ttl (float): seconds a result stays valid, None for ever.
+        typed (bool): cache arguments of different types separately.
+        key (callable): builds the cache key from (args, kwargs, typed).
+
+    The decorated function gets a `cache` attribute, the cache holding
+    its results, and `cache_info()` returning the cache statistics.
+    None results are cached too. Exceptions are not cached; they are
+    raised in the caller and in every caller waiting on the same key.
+    """
+    def decorator(func):
+        """Wrap func with a single-flight cache."""
+        cache = policy(max_items=maxsize)
+        stats = cache.stats
+        if ttl is not None:
+            cache = TTLCache(cache, ttl)
+        lock = threading.Lock()
+        flights = {}
+
+        def lookup(cache_key):
+            """Return the cached result for cache_key or NONE."""
+            item = cache.get(cache_key)
+            if item is None:
+                return NONE
+            return None if item is NONE else item
+
+        def store(cache_key, result):
+            """Cache result, keeping None apart from a miss."""
+            cache.put(cache_key, NONE if result is None else result)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                """Return the cached result or await func once."""
+                cache_key = key(args, kwargs, typed)
+                with lock:
+                    result = lookup(cache_key)
+                    if result is not NONE:
+                        return result
+                    flight = flights.get(cache_key)
+                    if flight is None:
+                        flight = asyncio.get_running_loop().create_future()
+                        flights[cache_key] = flight
+                        leader = True
+                    else:
+                        leader = False
+                if not leader:
+                    return await asyncio.shield(flight)
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as error:
+                    with lock:
+                        del flights[cache_key]
+                    if isinstance(error, asyncio.CancelledError):
+                        flight.cancel()
+                    else:
+                        flight.set_exception(error)
+                        flight.exception()
+                    raise
+                with lock:
+                    store(cache_key, result)
+                    del flights[cache_key]
+                flight.set_result(result)
+                return result
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                """Return the cached result or call func once."""
+                cache_key = key(args, kwargs, typed)
+                with lock:
+                    result = lookup(cache_key)
+                    if result is not NONE:
+                        return result
+                    flight = flights.get(cache_key)
+                    if flight is None:
+                        flight = flights[cache_key] = Flight()
+                        leader = True
+                    else:
+                        leader = False
+                if not leader:
+                    return flight.wait()
+                try:
+                    flight.result = func(*args, **kwargs)
+                except BaseException as error:
+                    flight.error = error
+                    raise
+                finally:
+                    with lock:
+                        if flight.error is None:
+                            store(cache_key, flight.result)
+                        del flights[cache_key]
+                    flight.done.set()
+                return flight.result
+
+        wrapper.cache = cache
+        wrapper.cache_info = stats.as_dict
+        return wrapper
+    return decorator
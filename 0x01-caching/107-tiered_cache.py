@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Two-tier cache module: a caching policy in memory over a disk log.
+
+Items the in-memory policy (L1) evicts are spilled to an append-only
+log on local disk (L2) instead of being dropped. A miss in L1 that
+hits L2 promotes the item back to memory, so the working set can be
+much larger than RAM while hot reads never touch the disk.
+"""
+import mmap
+import os
+import pickle
+import tempfile
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+class DiskLog():
+    """Append-only log of pickled items with an in-memory offset index.
+
+    `index` maps every live key to the offset and length of its last
+    record, oldest first. Overwritten and removed records stay in the
+    file as dead bytes until `compact` rewrites the live ones. Reads
+    go through a read-only memory map of the file.
+    """
+    COMPACT_MIN = 1 << 20
+
+    def __init__(self, path, max_bytes=None):
+        """Initialize an empty log at path.
+
+        Args:
+            path (str): file of the log, truncated if it exists.
+            max_bytes (int): most live bytes kept, the oldest records
+                being dropped beyond it. None for no limit.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.file = open(path, "w+b")
+        self.index = {}
+        self.end = 0
+        self.live_bytes = 0
+        self.map = None
+
+    def __read(self, offset, length):
+        """Return the item of the record at offset."""
+        if self.map is None or offset + length > len(self.map):
+            self.file.flush()
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        return pickle.loads(self.map[offset:offset + length])[1]
+
+    def put(self, key, item):
+        """Append a record for key, replacing any previous one."""
+        record = pickle.dumps((key, item), pickle.HIGHEST_PROTOCOL)
+        self.remove(key)
+        self.file.seek(self.end)
+        self.file.write(record)
+        self.index[key] = (self.end, len(record))
+        self.end += len(record)
+        self.live_bytes += len(record)
+        if self.max_bytes is not None:
+            while self.live_bytes > self.max_bytes:
+                self.remove(next(iter(self.index)))
+        if self.end > max(2 * self.live_bytes, self.COMPACT_MIN):
+            self.compact()
+
+    def get(self, key):
+        """Return the item of key, or None if it is not in the log."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        return self.__read(*entry)
+
+    def remove(self, key):
+        """Remove key from the log, its record becoming dead bytes."""
+        entry = self.index.pop(key, None)
+        if entry is not None:
+            self.live_bytes -= entry[1]
+
+    def pop(self, key):
+        """Remove key from the log and return its item."""
+        item = self.get(key)
+        self.remove(key)
+        return item
+
+    def compact(self):
+        """Rewrite the live records to a new file, dropping dead bytes."""
+        self.file.flush()
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        index = {}
+        end = 0
+        with open(self.path + ".compact", "wb") as out:
+            for key, (offset, length) in self.index.items():
+                self.file.seek(offset)
+                out.write(self.file.read(length))
+                index[key] = (end, length)
+                end += length
+        self.file.close()
+        os.replace(self.path + ".compact", self.path)
+        self.file = open(self.path, "r+b")
+        self.index = index
+        self.end = end
+
+    def close(self):
+        """Close the log file."""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+
+class TieredCache():
+    """An in-memory policy (L1) backed by a disk log (L2).
+
+    L1 spills what it evicts for capacity to L2; a key found in L2 is
+    moved back to L1, which may in turn spill its own victim.
+    """
+    def __init__(self, cache=None, path=None, max_bytes=64 * 1024 ** 2):
+        """Initialize the two tiers.
+
+        Args:
+            cache (BaseCaching): the L1 policy, an LRUCache by default.
+            path (str): file of the L2 log, a temporary file if None.
+            max_bytes (int): most live bytes the L2 log keeps.
+        """
+        if cache is None:
+            cache = LRUCache()
+        self.temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".l2")
+            os.close(fd)
+        self.l1 = cache
+        self.l2 = DiskLog(path, max_bytes)
+        self.promotions = 0
+        cache.on_evict(self.__spill)
+
+    def __spill(self, key, item, reason):
+        """Write an item L1 evicted for capacity or size to L2."""
+        if item is not None and reason in ("capacity", "size"):
+            self.l2.put(key, item)
+
+    def put(self, key, item):
+        """Add an item to L1, dropping any older copy from L2.
+        An item L1 refuses, e.g. bigger than its byte budget, goes
+        straight to L2.
+        """
+        if key is None or item is None:
+            return
+        self.l2.remove(key)
+        self.l1.put(key, item)
+        if key not in self.l1.cache_data:
+            self.l2.put(key, item)
+
+    def get(self, key):
+        """Retrieve an item from L1, or promote it from L2."""
+        if key is None:
+            return None
+        item = self.l1.get(key)
+        if item is not None:
+            return item
+        item = self.l2.pop(key)
+        if item is not None:
+            self.promotions += 1
+            self.l1.put(key, item)
+            if key not in self.l1.cache_data:
+                self.l2.put(key, item)
+        return item
+
+    def pop(self, key):
+        """Remove key from both tiers and return its item."""
+        item = self.l1.pop(key)
+        if item is None:
+            return self.l2.pop(key)
+        self.l2.remove(key)
+        return item
+
+    def print_cache(self):
+        """Print the L1 entries, then the keys held in L2."""
+        self.l1.print_cache()
+        print("On disk: {} keys, {} bytes".format(len(self.l2.index),
+                                                  self.l2.live_bytes))
+
+    def close(self):
+        """Close the L2 log, removing it if it was a temporary file."""
+        self.l2.close()
+        if self.temporary:
+            os.remove(self.l2.path)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Memory and throughput benchmark of the ordered stores.
+
+FIFOCache, LIFOCache, LRUCache and MRUCache keep their order in a
+STORE, an OrderedDict by default. This compares each of them with a
+subclass using linked_store.LinkedStore, a pure Python dict of
+`__slots__` nodes, filled with one million entries by default.
+
+Usage: python3 108-store_benchmark.py [ENTRIES]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from linked_store import LinkedStore
+
+POLICIES = [
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+]
+
+
+def compact(policy):
+    """Return a subclass of policy storing its items in a LinkedStore."""
+    return type("Linked" + policy.__name__, (policy,),
+                {"STORE": LinkedStore})
+
+
+def measure(policy, keys, lookups, extra):
+    """Fill a policy instance with keys, then time hits and evictions.
+
+    Returns:
+        dict: bytes per entry and put, get and evicting put rates.
+    """
+    gc.collect()
+    tracemalloc.start()
+    cache = policy(max_items=len(keys))
+    for key in keys:
+        cache.put(key, True)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    gc.collect()
+
+    cache = policy(max_items=len(keys))
+    put = cache.put
+    start = time.perf_counter()
+    for key in keys:
+        put(key, True)
+    put_time = time.perf_counter() - start
+    get = cache.get
+    start = time.perf_counter()
+    for key in lookups:
+        get(key)
+    get_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in extra:
+        put(key, True)
+    evict_time = time.perf_counter() - start
+    return {
+        "bytes": memory / len(keys),
+        "put": len(keys) / put_time,
+        "get": len(lookups) / get_time,
+        "evict": len(extra) / evict_time,
+    }
+
+
+def main(entries=1000000):
+    """Print the benchmark table for entries keys."""
+    rand = random.Random(0)
+    keys = ["key{}".format(i) for i in range(entries)]
+    lookups = [keys[rand.randrange(entries)] for _ in range(entries)]
+    extra = ["new{}".format(i) for i in range(entries // 5)]
+    line = "{:<20}{:>12}{:>12}{:>12}{:>14}"
+    print(line.format("policy", "B/entry", "puts/s", "hits/s",
+                      "evicting/s"))
+    for policy in POLICIES:
+        for variant in (policy, compact(policy)):
+            result = measure(variant, keys, lookups, extra)
+            print(line.format(variant.__name__,
+                              "{:.0f}".format(result["bytes"]),
+                              "{:.0f}".format(result["put"]),
+                              "{:.0f}".format(result["get"]),
+                              "{:.0f}".format(result["evict"])))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Cache shared by worker processes through shared memory.
+
+The cache lives in a `multiprocessing.shared_memory` segment laid out
+as a fixed-slot, set-associative hash table: a key hashes to a bucket
+of `ways` slots and, when the bucket is full, a CLOCK hand sweeping
+that bucket picks a slot whose reference bit is clear, approximating
+LRU. Keys and items are pickled into the slots, so every process sees
+the same entries and the memory is paid once.
+
+Writers take the lock of the bucket's stripe. Readers take no lock:
+each bucket has a sequence number, odd while a writer is busy with it,
+and a read is retried when the number changed under it (a seqlock).
+
+Running this file benchmarks it against one private LRUCache per
+worker process.
+"""
+import hashlib
+import multiprocessing
+import pickle
+import struct
+import time
+from multiprocessing import shared_memory
+
+from base_caching import CacheStats
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+HEADER = struct.Struct("<8sIII12x")
+BUCKET = struct.Struct("<IB3x")
+SLOT = struct.Struct("<BBHIQ")
+MAGIC = b"SHMCACHE"
+
+
+def stable_hash(data):
+    """Hash bytes the same way in every process, unlike hash()."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          "little")
+
+
+class SharedMemoryCache():
+    """A put/get cache stored in a shared memory segment.
+
+    Create it in the parent process before forking the workers: they
+    inherit the segment and the stripe locks. Items whose pickled key
+    and value do not fit in a slot are not cached.
+    """
+    READ_RETRIES = 8
+
+    def __init__(self, buckets=1024, ways=8, slot_size=256, locks=64,
+                 name=None):
+        """Create the segment.
+
+        Args:
+            buckets (int): number of buckets of the hash table.
+            ways (int): slots per bucket; buckets * ways is the
+                most items the cache holds.
+            slot_size (int): bytes per slot, its header included.
+            locks (int): number of writer lock stripes.
+            name (str): name of the segment, a random one if None.
+        """
+        self.buckets = buckets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.bucket_size = BUCKET.size + ways * slot_size
+        size = HEADER.size + buckets * self.bucket_size
+        self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, buckets, ways, slot_size)
+        self.locks = [multiprocessing.Lock() for _ in range(locks)]
+        self.stats = CacheStats()
+
+    def __locate(self, key):
+        """Return the pickled key, its hash and its bucket offset."""
+        data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        h = stable_hash(data)
+        return data, h, HEADER.size + (h % self.buckets) * self.bucket_size
+
+    def __find(self, data, h, base):
+        """Return the offset of the slot holding the pickled key in
+        the bucket at base, or None.
+        """
+        buf = self.buf
+        klen = len(data)
+        offset = base + BUCKET.size
+        for _ in range(self.ways):
+            used, _, slot_klen, _, slot_h = SLOT.unpack_from(buf, offset)
+            start = offset + SLOT.size
+            if (used and slot_h == h and slot_klen == klen and
+                    buf[start:start + klen] == data):
+                return offset
+            offset += self.slot_size
+        return None
+
+    def get(self, key):
+        """Retrieve an item without locking, retrying torn reads."""
+        if key is None:
+            return self.stats.lookup(None)
+        data, h, base = self.__locate(key)
+        buf = self.buf
+        for _ in range(self.READ_RETRIES):
+            seq = BUCKET.unpack_from(buf, base)[0]
+            if seq & 1:
+                continue
+            offset = self.__find(data, h, base)
+            if offset is not None:
+                _, _, klen, vlen, _ = SLOT.unpack_from(buf, offset)
+                start = offset + SLOT.size + klen
+                value = bytes(buf[start:start + vlen])
+            if BUCKET.unpack_from(buf, base)[0] == seq:
+                break
+        else:
+            lock = self.locks[(base // self.bucket_size) % len(self.locks)]
+            with lock:
+                offset = self.__find(data, h, base)
+                if offset is not None:
+                    _, _, klen, vlen, _ = SLOT.unpack_from(buf, offset)
+                    start = offset + SLOT.size + klen
+                    value = bytes(buf[start:start + vlen])
+        if offset is None:
+            return self.stats.lookup(None)
+        buf[offset + 1] = 1
+        return self.stats.lookup(pickle.loads(value))
+
+    def __begin(self, base):
+        """Mark the bucket at base as being written."""
+        seq, hand = BUCKET.unpack_from(self.buf, base)
+        BUCKET.pack_into(self.buf, base, (seq + 1) & 0xFFFFFFFF, hand)
+        return hand
+
+    def __end(self, base, hand):
+        """Mark the bucket at base as consistent again."""
+        seq = BUCKET.unpack_from(self.buf, base)[0]
+        BUCKET.pack_into(self.buf, base, (seq + 1) & 0xFFFFFFFF, hand)
+
+    def put(self, key, item):
+        """Add an item, the CLOCK hand of its bucket picking the slot
+        to reuse when the bucket is full.
+        """
+        if key is None or item is None:
+            return
+        data, h, base = self.__locate(key)
+        value = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if SLOT.size + len(data) + len(value) > self.slot_size:
+            return
+        buf = self.buf
+        lock = self.locks[(base // self.bucket_size) % len(self.locks)]
+        with lock:
+            hand = self.__begin(base)
+            offset = self.__find(data, h, base)
+            if offset is None:
+                self.stats.inserts += 1
+                first = base + BUCKET.size
+                while True:
+                    offset = first + hand * self.slot_size
+                    hand = (hand + 1) % self.ways
+                    if not buf[offset]:
+                        break
+                    if not buf[offset + 1]:
+                        self.stats.evictions += 1
+                        break
+                    buf[offset + 1] = 0
+            SLOT.pack_into(buf, offset, 1, 1, len(data), len(value), h)
+            start = offset + SLOT.size
+            buf[start:start + len(data)] = data
+            start += len(data)
+            buf[start:start + len(value)] = value
+            self.__end(base, hand)
+
+    def pop(self, key):
+        """Remove key from the cache and return its item."""
+        data, h, base = self.__locate(key)
+        lock = self.locks[(base // self.bucket_size) % len(self.locks)]
+        with lock:
+            offset = self.__find(data, h, base)
+            if offset is None:
+                return None
+            hand = self.__begin(base)
+            _, _, klen, vlen, _ = SLOT.unpack_from(self.buf, offset)
+            start = offset + SLOT.size + klen
+            item = pickle.loads(bytes(self.buf[start:start + vlen]))
+            self.buf[offset] = 0
+            self.__end(base, hand)
+        return item
+
+    def items(self):
+        """Yield every (key, item) pair of the cache."""
+        buf = self.buf
+        for bucket in range(self.buckets):
+            offset = HEADER.size + bucket * self.bucket_size + BUCKET.size
+            for _ in range(self.ways):
+                used, _, klen, vlen, _ = SLOT.unpack_from(buf, offset)
+                if used:
+                    start = offset + SLOT.size
+                    key = pickle.loads(bytes(buf[start:start + klen]))
+                    start += klen
+                    yield key, pickle.loads(bytes(buf[start:start + vlen]))
+                offset += self.slot_size
+
+    def print_cache(self):
+        """Print the cache."""
+        cache_data = dict(self.items())
+        print("Current cache:")
+        for key in sorted(cache_data.keys()):
+            print("{}: {}".format(key, cache_data.get(key)))
+
+    def close(self):
+        """Detach this process from the segment."""
+        self.buf.release()
+        self.shm.close()
+
+    def unlink(self):
+        """Destroy the segment, once every process has closed it."""
+        self.shm.unlink()
+
+
+def worker(cache, trace, results):
+    """Replay trace through cache as a read-through cache."""
+    if cache is None:
+        cache = LRUCache(max_items=results["capacity"])
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, "value-{}".format(key))
+    elapsed = time.perf_counter() - start
+    results[multiprocessing.current_process().name] = (
+        cache.stats.hits, cache.stats.misses, elapsed)
+
+
+def benchmark(workers=4, capacity=8192, keys=100000, length=100000):
+    """Run workers processes on Zipf traces, sharing one cache of
+    capacity items or each holding a private LRUCache of that size.
+
+    Returns:
+        dict: hit ratio and total ops/s of the shared and private runs.
+    """
+    import random
+    rand = random.Random(0)
+    weights = [1 / (k + 1) for k in range(keys)]
+    traces = [rand.choices(range(keys), weights, k=length)
+              for _ in range(workers)]
+    context = multiprocessing.get_context("fork")
+    report = {}
+    for mode in ("shared", "private"):
+        cache = None
+        if mode == "shared":
+            cache = SharedMemoryCache(buckets=capacity // 8, ways=8)
+        with context.Manager() as manager:
+            results = manager.dict(capacity=capacity)
+            processes = [context.Process(target=worker,
+                                         args=(cache, trace, results))
+                         for trace in traces]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            runs = [v for k, v in results.items() if k != "capacity"]
+        if cache is not None:
+            cache.close()
+            cache.unlink()
+        hits = sum(run[0] for run in runs)
+        lookups = sum(run[0] + run[1] for run in runs)
+        report[mode] = {
+            "hit_ratio": hits / lookups,
+            "ops_per_sec": sum(run[0] + 2 * run[1] for run in runs) /
+            max(run[2] for run in runs),
+            "cached_items": capacity * (1 if mode == "shared" else workers),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    for workers in (1, 2, 4, 8):
+        report = benchmark(workers)
+        for mode, result in report.items():
+            print("{} workers, {:<7}: hit ratio {:.3f}, {:.0f} ops/s, "
+                  "{} items held".format(workers, mode, result["hit_ratio"],
+                                         result["ops_per_sec"],
+                                         result["cached_items"]))
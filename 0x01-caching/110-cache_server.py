@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Cache server hosting a caching policy over a socket, and its client.
+
+The server runs one policy instance in an asyncio event loop, so the
+policy needs no lock, and serves it over TCP or a Unix socket with a
+small memcached-like text protocol, one command per line:
+
+    get <key>                   ->  VALUE <n>\\r\\n<n bytes>  or  MISS
+    put <key> <n>\\r\\n<n bytes>  ->  OK
+    pop <key>                   ->  VALUE <n>\\r\\n<n bytes>  or  MISS
+    stats                       ->  VALUE <n>\\r\\n<n bytes of JSON>
+
+Every line ends with \\r\\n and errors are answered with ERROR <message>.
+Keys are text without spaces, items opaque bytes. A client may send
+many commands before reading the answers (pipelining); they are
+answered in order.
+
+Usage: python3 110-cache_server.py [-p POLICY] [-c CAPACITY]
+           [-b BYTES] [--host HOST] [--port PORT] [--unix PATH]
+"""
+import argparse
+import asyncio
+import json
+import pickle
+import queue
+import socket
+
+POLICIES = __import__('105-cache_simulator').POLICIES
+
+PORT = 11311
+MAX_KEY = 250
+MAX_VALUE = 1 << 20
+PIPELINE = 64
+
+
+class ProtocolError(Exception):
+    """A malformed command or answer."""
+
+
+class CacheServer():
+    """Serve a BaseCaching instance to any number of connections."""
+    def __init__(self, cache):
+        """Initialize the server.
+
+        Args:
+            cache (BaseCaching): the policy instance to serve. Items
+                are bytes, so a byte budget should measure them with
+                sizeof=len.
+        """
+        self.cache = cache
+
+    def execute(self, command, args, data=None):
+        """Run one command and return its answer."""
+        if command == b"get" and len(args) == 1:
+            return self.__value(self.cache.get(args[0].decode()))
+        if command == b"put" and len(args) == 2:
+            self.cache.put(args[0].decode(), data)
+            return b"OK\r\n"
+        if command == b"pop" and len(args) == 1:
+            return self.__value(self.cache.pop(args[0].decode()))
+        if command == b"stats" and not args:
+            return self.__value(json.dumps(self.cache.stats.as_dict())
+                                .encode())
+        raise ProtocolError("unknown command")
+
+    @staticmethod
+    def __value(item):
+        """Return the answer carrying item, or MISS for None."""
+        if item is None:
+            return b"MISS\r\n"
+        return b"VALUE %d\r\n%s\r\n" % (len(item), item)
+
+    @staticmethod
+    async def __skip(reader, size):
+        """Read and drop the next size bytes, MAX_VALUE at a time, so
+        that data never read as a value is not read as commands."""
+        while size:
+            size -= len(await reader.readexactly(min(size, MAX_VALUE)))
+
+    async def handle(self, reader, writer):
+        """Answer the commands of one connection until it closes.
+        The data of a put is always read, even when the value is
+        refused; a put whose size cannot be read closes the
+        connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, *args = line.split() or [b""]
+                data = None
+                framed = True
+                try:
+                    if command == b"put":
+                        if len(args) != 2 or not args[1].isdigit():
+                            # where its data ends is unknown
+                            framed = False
+                            raise ProtocolError("usage: put <key> <n>")
+                        size = int(args[1])
+                        if size > MAX_VALUE:
+                            await self.__skip(reader, size + 2)
+                            raise ProtocolError("value too large")
+                        data = await reader.readexactly(size + 2)
+                        if data[-2:] != b"\r\n":
+                            raise ProtocolError("bad data chunk")
+                        data = data[:-2]
+                    if args and len(args[0]) > MAX_KEY:
+                        raise ProtocolError("key too long")
+                    answer = self.execute(command, args, data)
+                except (ProtocolError, UnicodeDecodeError) as error:
+                    answer = b"ERROR %s\r\n" % str(error).encode()
+                writer.write(answer)
+                await writer.drain()
+                if not framed:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=PORT, path=None):
+        """Start listening on host and port, or on the Unix socket
+        at path, and return the asyncio server."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+class CacheClient():
+    """Client of a CacheServer with the put/get API of the policies.
+
+    Connections are kept in a pool shared by the threads using the
+    client; at most pool_size are opened. Items are serialized with
+    dumps and loads, pickle by default, so only talk to a server that
+    trusted clients fill.
+    """
+    def __init__(self, host="127.0.0.1", port=PORT, path=None,
+                 pool_size=4, timeout=5.0, dumps=None, loads=None):
+        """Initialize the client; connections are opened when needed.
+
+        Args:
+            host (str): host of a TCP server.
+            port (int): port of a TCP server.
+            path (str): path of a Unix socket server, instead of TCP.
+            pool_size (int): most connections opened at once.
+            timeout (float): seconds a socket operation may take.
+            dumps (callable): serializer turning an item into bytes.
+            loads (callable): deserializer of dumps' output.
+        """
+        self.address = path if path is not None else (host, port)
+        self.family = socket.AF_UNIX if path is not None else socket.AF_INET
+        self.timeout = timeout
+        self.dumps = dumps or (
+            lambda item: pickle.dumps(item, pickle.HIGHEST_PROTOCOL))
+        self.loads = loads or pickle.loads
+        self.pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self.pool.put(None)
+
+    def __connect(self):
+        """Open a connection and return it with its read buffer."""
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        if self.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, sock.makefile("rb")
+
+    def __call(self, requests):
+        """Send the encoded requests pipelined on one pooled connection
+        and return the decoded answers, in order."""
+        conn = self.pool.get()
+        try:
+            if conn is None:
+                conn = self.__connect()
+            sock, rfile = conn
+            answers = []
+            for start in range(0, len(requests), PIPELINE):
+                chunk = requests[start:start + PIPELINE]
+                sock.sendall(b"".join(chunk))
+                answers.extend(self.__read(rfile) for _ in chunk)
+        except BaseException:
+            if conn is not None:
+                conn[1].close()
+                conn[0].close()
+            self.pool.put(None)
+            raise
+        self.pool.put(conn)
+        return answers
+
+    @staticmethod
+    def __read(rfile):
+        """Read one answer: bytes for VALUE, None for MISS, True for OK.
+        """
+        line = rfile.readline()
+        if line.startswith(b"VALUE "):
+            data = rfile.read(int(line[6:]) + 2)
+            return data[:-2]
+        if line == b"MISS\r\n":
+            return None
+        if line == b"OK\r\n":
+            return True
+        if line.startswith(b"ERROR "):
+            raise ProtocolError(line[6:].strip().decode())
+        raise ConnectionError("connection closed by the server")
+
+    @staticmethod
+    def __key(key):
+        """Return key encoded for the protocol."""
+        if not isinstance(key, str):
+            raise TypeError("keys must be str, not {}".format(
+                type(key).__name__))
+        data = key.encode()
+        if len(data) > MAX_KEY or data.split() != [data]:
+            raise ValueError("invalid key: {!r}".format(key))
+        return data
+
+    def __put_request(self, key, item):
+        """Return the encoded put command of key and item."""
+        data = self.dumps(item)
+        return b"put %s %d\r\n%s\r\n" % (self.__key(key), len(data), data)
+
+    def put(self, key, item):
+        """Add an item in the server's cache."""
+        if key is None or item is None:
+            return
+        self.__call([self.__put_request(key, item)])
+
+    def get(self, key):
+        """Retrieve an item from the server's cache."""
+        if key is None:
+            return None
+        data = self.__call([b"get %s\r\n" % self.__key(key)])[0]
+        return None if data is None else self.loads(data)
+
+    def pop(self, key):
+        """Remove key from the server's cache and return its item."""
+        data = self.__call([b"pop %s\r\n" % self.__key(key)])[0]
+        return None if data is None else self.loads(data)
+
+    def get_many(self, keys):
+        """Retrieve the items of the keys found in the cache as a dict,
+        pipelining the gets."""
+        keys = [key for key in keys if key is not None]
+        answers = self.__call([b"get %s\r\n" % self.__key(key)
+                               for key in keys])
+        return {key: self.loads(data) for key, data in zip(keys, answers)
+                if data is not None}
+
+    def put_many(self, mapping):
+        """Add the items of mapping, pipelining the puts."""
+        self.__call([self.__put_request(key, item)
+                     for key, item in mapping.items()
+                     if key is not None and item is not None])
+
+    def stats(self):
+        """Return the statistics of the server's cache."""
+        return json.loads(self.__call([b"stats\r\n"])[0])
+
+    def close(self):
+        """Close the idle connections of the pool."""
+        conns = []
+        while True:
+            try:
+                conns.append(self.pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in conns:
+            if conn is not None:
+                conn[1].close()
+                conn[0].close()
+            self.pool.put(None)
+
+
+async def serve(cache, host, port, path):
+    """Serve cache until the process is interrupted."""
+    server = await CacheServer(cache).start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-p", "--policy", default="LRU",
+                        choices=sorted(POLICIES), help="caching policy")
+    parser.add_argument("-c", "--capacity", type=int, default=1024,
+                        help="cache capacity in items")
+    parser.add_argument("-b", "--bytes", type=int,
+                        help="cache capacity in bytes of items")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket")
+    args = parser.parse_args()
+    cache = POLICIES[args.policy](args.capacity, args.bytes,
+                                  len if args.bytes else None)
+    try:
+        asyncio.run(serve(cache, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
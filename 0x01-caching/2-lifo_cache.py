@@ -10,12 +10,17 @@ from base_caching import BaseCaching
 class LIFOCache(BaseCaching):
     """This class represents a cache with a Least-In-First-Out
     (LIFO) removal mechanism when the cache limit is reached.
+    Items are kept in insertion order in a STORE, an OrderedDict
+    unless a subclass picks e.g. linked_store.LinkedStore.
     """
-    def __init__(self):
-        """Initialize the cache with an empty OrderedDict.
+    STORE = OrderedDict
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the cache with an empty STORE.
+        Arguments are the capacity settings of BaseCaching.
         """
-        super().__init__()
-        self.cache_data = OrderedDict()
+        super().__init__(*args, **kwargs)
+        self.cache_data = self.STORE()
 
     def put(self, key, item):
         """Add an item to the cache.
@@ -30,10 +35,15 @@ class LIFOCache(BaseCaching):
         """
         if key is None or item is None:
             return
-        if key not in self.cache_data:
-            while len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                last_key, _ = self.cache_data.popitem(True)
-                print("DISCARD:", last_key)
+        size = self.item_size(item)
+        if not self.make_room(key, size):
+            return
+        self.account(key, size)
+        self.store(key, item)
+
+    def store(self, key, item):
+        """Store an item as the most recently added one.
+        """
         self.cache_data[key] = item
         self.cache_data.move_to_end(key, last=True)
 
@@ -43,4 +53,19 @@ class LIFOCache(BaseCaching):
         Return the value of the item if the key exists,
         otherwise return None.
         """
-        return self.cache_data.get(key, None)
+        return self.stats.lookup(self.cache_data.get(key, None))
+
+    def hit(self, key):
+        """Record a hit for get_many: the insertion order is unchanged.
+        """
+
+    def victim(self):
+        """Return the most recently added key, the next one to be removed.
+        """
+        return next(reversed(self.cache_data))
+
+    def victims(self):
+        """Return no key: every key put becomes the next victim, so a
+        batch needing evictions is put one item at a time.
+        """
+        return iter(())
@@ -9,11 +9,19 @@ class LRUCache(BaseCaching):
     """LRU Cache class for storing and retrieving items
     with a Least Recently Used removal mechanism when
     the cache limit is reached.
+    Items are kept most recently used first in a STORE, an OrderedDict
+    unless a subclass picks e.g. linked_store.LinkedStore. A STORE
+    offering touch and put, as LinkedStore does, is read and reordered
+    with a single lookup per operation through them.
     """
-    def __init__(self):
-        """Initialize the LRU Cache."""
-        super().__init__()
-        self.cache_data = OrderedDict()
+    STORE = OrderedDict
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the LRU Cache with the capacity settings
+        of BaseCaching."""
+        super().__init__(*args, **kwargs)
+        self.cache_data = self.STORE()
+        self.touch = getattr(self.cache_data, "touch", None)
 
     def put(self, key, item):
         """Add or update an item in the LRU Cache.
@@ -22,11 +30,20 @@ class LRUCache(BaseCaching):
         if key is None or item is None:
             return
 
+        size = self.item_size(item)
+        if not self.make_room(key, size):
+            return
+        self.account(key, size)
+        self.store(key, item)
+
+    def store(self, key, item):
+        """Store an item, a new key becoming the most recently used.
+        """
+        if self.touch is not None:
+            self.cache_data.put(key, item, last=False)
+            return
         while True:
             if key not in self.cache_data:
-                if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                    lru_key, _ = self.cache_data.popitem(True)
-                    print("DISCARD:", lru_key)
                 self.cache_data[key] = item
                 self.cache_data.move_to_end(key, last=False)
                 break
@@ -38,6 +55,26 @@ class LRUCache(BaseCaching):
         """Retrieve an item from the LRU Cache.
         Update the item as the most recently used.
         """
-        if key is not None and key in self.cache_data:
+        if self.touch is not None:
+            return self.stats.lookup(self.touch(key, False))
+        item = self.cache_data.get(key, None)
+        if item is not None:
             self.cache_data.move_to_end(key, last=False)
-        return self.cache_data.get(key, None)
+        return self.stats.lookup(item)
+
+    def hit(self, key):
+        """Make a key found by get_many the most recently used."""
+        if self.touch is not None:
+            self.touch(key, False)
+            return
+        self.cache_data.move_to_end(key, last=False)
+
+    def victim(self):
+        """Return the least recently used key."""
+        return next(reversed(self.cache_data))
+
+    def victims(self):
+        """Return the keys least recently used first; a new key is the
+        most recently used and putting a cached key does not move it.
+        """
+        return reversed(self.cache_data)
@@ -11,13 +11,21 @@ class MRUCache(BaseCaching):
     """
     MRUCache class manages a cache with Most Recently Used eviction policy.
     When the cache limit is reached, least recently used item is discarded.
+    Items are kept most recently used first in a STORE, an OrderedDict
+    unless a subclass picks e.g. linked_store.LinkedStore. A STORE
+    offering touch and put, as LinkedStore does, is read and reordered
+    with a single lookup per operation through them.
     """
-    def __init__(self):
+    STORE = OrderedDict
+
+    def __init__(self, *args, **kwargs):
         """
-        Initialize the cache with an OrderedDict to track item usage order.
+        Initialize the cache with a STORE to track item usage order.
+        Arguments are the capacity settings of BaseCaching.
         """
-        super().__init__()
-        self.cache_data = OrderedDict()
+        super().__init__(*args, **kwargs)
+        self.cache_data = self.STORE()
+        self.touch = getattr(self.cache_data, "touch", None)
 
     def put(self, key, item):
         """
@@ -27,17 +35,19 @@ class MRUCache(BaseCaching):
         if key is None or item is None:
             return
 
-        do_discard = False
-        if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                do_discard = True
-
-        while do_discard:
-            mru_key, _ = self.cache_data.popitem(False)
-            print("DISCARD:", mru_key)
-            if len(self.cache_data) + 1 <= BaseCaching.MAX_ITEMS:
-                do_discard = False
+        size = self.item_size(item)
+        if not self.make_room(key, size):
+            return
+        self.account(key, size)
+        self.store(key, item)
 
+    def store(self, key, item):
+        """
+        Store an item as the most recently used.
+        """
+        if self.touch is not None:
+            self.cache_data.put(key, item, last=False, move=True)
+            return
         self.cache_data[key] = item
         self.cache_data.move_to_end(key, last=False)
 
@@ -46,6 +56,31 @@ class MRUCache(BaseCaching):
         Retrieve an item from the cache and update its usage order.
         Return None if the key is not found.
         """
-        if key is not None and key in self.cache_data:
+        if self.touch is not None:
+            return self.stats.lookup(self.touch(key, False))
+        item = self.cache_data.get(key, None)
+        if item is not None:
             self.cache_data.move_to_end(key, last=False)
-        return self.cache_data.get(key, None)
+        return self.stats.lookup(item)
+
+    def hit(self, key):
+        """
+        Make a key found by get_many the most recently used.
+        """
+        if self.touch is not None:
+            self.touch(key, False)
+            return
+        self.cache_data.move_to_end(key, last=False)
+
+    def victim(self):
+        """
+        Return the most recently used key, the next one to be discarded.
+        """
+        return next(iter(self.cache_data))
+
+    def victims(self):
+        """
+        Return no key: every key put becomes the next victim, so a
+        batch needing evictions is put one item at a time.
+        """
+        return iter(())
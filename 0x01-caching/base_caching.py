@@ -1,18 +1,176 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import pickle
+import sys
+import time
+
+SNAPSHOT_MAGIC = b"BCSNAP\x01\n"
+
+
+def print_discard(key, item, reason):
+    """ Eviction listener printing the discarded key
+    """
+    print("DISCARD:", key)
+
+
+class LatencyHistogram():
+    """ Histogram of operation latencies in nanoseconds
+
+    Bucket n counts the latencies whose bit length is n, that is the
+    ones from 2 ** (n - 1) up to 2 ** n - 1 nanoseconds.
+    """
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+
+    def record(self, ns):
+        """ Count one latency of ns nanoseconds
+        """
+        self.buckets[min(ns.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += ns
+
+    def percentile(self, p):
+        """ Upper bound in nanoseconds of the p-th percentile
+        """
+        rank = self.count * p / 100
+        seen = 0
+        for n, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return (1 << n) - 1
+        return 0
+
+    def as_dict(self):
+        """ Summary of the histogram for a metrics exporter
+        """
+        return {
+            "count": self.count,
+            "mean_ns": self.total / self.count if self.count else 0.0,
+            "p50_ns": self.percentile(50),
+            "p99_ns": self.percentile(99),
+        }
+
+
+class CacheStats():
+    """ Counters of a cache, and latency histograms when timed
+    """
+    COUNTERS = ("hits", "misses", "inserts", "evictions", "expirations")
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.latency = {}
+
+    def lookup(self, item):
+        """ Count a get finding item, None being a miss, and return it
+        """
+        if item is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return item
+
+    def timed(self, name, method):
+        """ Wrap method to record its latency under name
+        """
+        histogram = self.latency[name] = LatencyHistogram()
+        clock = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            """ Call method and record how long it took
+            """
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+        return wrapper
+
+    def add(self, other):
+        """ Add the counters of other to these ones
+        """
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    @property
+    def hit_ratio(self):
+        """ Share of gets that found their key
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def eviction_rate(self):
+        """ Evictions per inserted key
+        """
+        return self.evictions / self.inserts if self.inserts else 0.0
+
+    def as_dict(self):
+        """ Counters and ratios for a metrics exporter
+        """
+        stats = {name: getattr(self, name) for name in self.COUNTERS}
+        stats["hit_ratio"] = self.hit_ratio
+        stats["eviction_rate"] = self.eviction_rate
+        for name, histogram in self.latency.items():
+            stats[name + "_latency"] = histogram.as_dict()
+        return stats
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the capacity of an instance, as an item count and/or a byte budget
+      - its statistics and the listeners called on every eviction
+      - how its entries and their policy metadata are snapshotted
     """
     MAX_ITEMS = 4
+    hit = None
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizeof=None,
+                 timed=False):
         """ Initiliaze
+
+        Args:
+            max_items (int): most items the cache may hold, at least 1.
+                Defaults to MAX_ITEMS, or to no item limit when only
+                max_bytes is set.
+            max_bytes (int): most bytes the cached items may add up to,
+                as measured by sizeof. None means no byte budget.
+            sizeof (callable): size estimator taking an item and
+                returning its size in bytes. Defaults to sys.getsizeof
+                when max_bytes is set.
+            timed (bool): record get and put latencies in stats.
         """
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be a positive integer")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if max_items is None and max_bytes is None:
+            max_items = self.MAX_ITEMS
+        if sizeof is None and max_bytes is not None:
+            sizeof = sys.getsizeof
         self.cache_data = {}
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.cache_sizes = {}
+        self.cache_bytes = 0
+        self.stats = CacheStats()
+        self.evict_listeners = []
+        if timed:
+            self.get = self.stats.timed("get", self.get)
+            self.put = self.stats.timed("put", self.put)
 
     def print_cache(self):
         """ Print the cache
@@ -30,3 +188,248 @@ class BaseCaching():
         """ Get an item by key
         """
         raise NotImplementedError("get must be implemented in your cache class")
+
+    def get_many(self, keys):
+        """ Items of the keys found in the cache, as a dict
+        Hits update the policy metadata in the order of keys, exactly
+        as a loop of get would. A policy whose get is a lookup in
+        cache_data then an update of the key found defines that update
+        as hit(key): the keys are then looked up here, and the stats
+        counted once per batch.
+        """
+        found = {}
+        if self.hit is None:
+            for key in keys:
+                item = self.get(key)
+                if item is not None:
+                    found[key] = item
+            return found
+        cache_data = self.cache_data
+        hit = self.hit
+        hits = misses = 0
+        for key in keys:
+            item = cache_data.get(key, None)
+            if item is None:
+                misses += 1
+            else:
+                hit(key)
+                found[key] = item
+                hits += 1
+        self.stats.hits += hits
+        self.stats.misses += misses
+        return found
+
+    def put_many(self, mapping):
+        """ Add every (key, item) of mapping, as a loop of put would
+        When the policy can tell its next victims (see victims), the
+        evictions the whole batch needs are found first and made at
+        once, then the items are stored without any capacity check.
+        """
+        batch = [(key, item) for key, item in mapping.items()
+                 if key is not None and item is not None]
+        plan = self.plan_evictions(batch)
+        if plan is None:
+            for key, item in batch:
+                self.put(key, item)
+            return
+        victims, sizes = plan
+        for victim in victims:
+            self.discard(victim)
+        for (key, item), size in zip(batch, sizes):
+            self.account(key, size)
+            self.store(key, item)
+
+    def plan_evictions(self, batch):
+        """ Victims and item sizes of putting the (key, item) pairs of
+        batch in order, or None when the batch has to be put one item
+        at a time: an item is too big for the byte budget, the policy
+        cannot tell its victims, or a victim is itself in the batch.
+        """
+        victims = self.victims()
+        if victims is None:
+            return None
+        keys = {key for key, _ in batch}
+        count = len(self.cache_data)
+        nbytes = self.cache_bytes
+        evicted = []
+        sizes = []
+        for key, item in batch:
+            size = self.item_size(item)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return None
+            if key in self.cache_data:
+                nbytes += size - self.cache_sizes.get(key, 0)
+            else:
+                count += 1
+                nbytes += size
+            while ((self.max_items is not None and count > self.max_items) or
+                   (self.max_bytes is not None and nbytes > self.max_bytes)):
+                victim = next(victims, None)
+                if victim is None or victim in keys:
+                    return None
+                evicted.append(victim)
+                count -= 1
+                nbytes -= self.cache_sizes.get(victim, 0)
+            sizes.append(size)
+        return evicted, sizes
+
+    def item_size(self, item):
+        """ Size of an item in bytes, 0 when sizes are not tracked
+        """
+        if self.sizeof is None:
+            return 0
+        return self.sizeof(item)
+
+    def is_full(self, key, size):
+        """ Tell if storing key with an item of size bytes would go
+        over the item count or the byte budget
+        """
+        count = len(self.cache_data)
+        if key not in self.cache_data:
+            count += 1
+        if self.max_items is not None and count > self.max_items:
+            return True
+        if self.max_bytes is None:
+            return False
+        nbytes = self.cache_bytes - self.cache_sizes.get(key, 0) + size
+        return nbytes > self.max_bytes
+
+    def make_room(self, key, size):
+        """ Discard victims until key with an item of size bytes fits
+        Return False when the item can never fit in the byte budget;
+        any older item stored under key is then discarded too.
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            if key in self.cache_data:
+                self.discard(key, "size")
+            return False
+        while self.is_full(key, size):
+            self.discard(self.victim())
+        return True
+
+    def account(self, key, size):
+        """ Record the size of the item about to be stored under key
+        """
+        if key not in self.cache_data:
+            self.stats.inserts += 1
+        if self.sizeof is None:
+            return
+        self.cache_bytes += size - self.cache_sizes.get(key, 0)
+        self.cache_sizes[key] = size
+
+    def pop(self, key):
+        """ Remove key from the cache and return its item
+        Policies keeping extra metadata per key extend this.
+        """
+        item = self.cache_data.pop(key, None)
+        size = self.cache_sizes.pop(key, None)
+        if size is not None:
+            self.cache_bytes -= size
+        return item
+
+    def discard(self, key, reason="capacity"):
+        """ Evict key from the cache and tell the eviction listeners
+        """
+        item = self.pop(key)
+        if reason == "expired":
+            self.stats.expirations += 1
+        else:
+            self.stats.evictions += 1
+        for listener in self.evict_listeners:
+            listener(key, item, reason)
+
+    def on_evict(self, listener):
+        """ Register listener(key, item, reason) to call on evictions
+        Use print_discard to print every discarded key.
+        """
+        self.evict_listeners.append(listener)
+        return listener
+
+    def shrink(self):
+        """ Discard victims until the cache is within its limits again
+        """
+        while self.cache_data and (
+                (self.max_items is not None and
+                 len(self.cache_data) > self.max_items) or
+                (self.max_bytes is not None and
+                 self.cache_bytes > self.max_bytes)):
+            self.discard(self.victim())
+
+    def snapshot_state(self):
+        """ Policy metadata not attached to a cached entry
+        """
+        return None
+
+    def restore_state(self, state):
+        """ Reload the metadata returned by snapshot_state
+        """
+
+    def snapshot_entries(self):
+        """ (key, item, metadata) of every entry, in the order that
+        restore_entry has to see them to rebuild the policy order
+        """
+        for key, item in self.cache_data.items():
+            yield key, item, None
+
+    def restore_entry(self, key, item, meta):
+        """ Reload an entry yielded by snapshot_entries
+        """
+        self.account(key, self.item_size(item))
+        self.cache_data[key] = item
+
+    def snapshot(self, path):
+        """ Save the entries and the policy metadata to path
+
+        The file holds a magic header then a stream of pickles: the
+        policy name, entry count and state, then one record per entry,
+        so neither saving nor restoring needs a second copy in memory.
+        """
+        with open(path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+            pickler.dump((type(self).__name__, len(self.cache_data),
+                          self.snapshot_state()))
+            for entry in self.snapshot_entries():
+                pickler.dump(entry)
+                pickler.clear_memo()
+
+    def restore(self, path):
+        """ Replace the content of the cache by the snapshot at path
+        Entries beyond the capacity of this cache are discarded in
+        policy order. Only restore snapshots from a trusted source:
+        they are unpickled.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a cache snapshot".format(path))
+            unpickler = pickle.Unpickler(f)
+            name, count, state = unpickler.load()
+            if name != type(self).__name__:
+                raise ValueError("snapshot of a {} cannot be restored in a "
+                                 "{}".format(name, type(self).__name__))
+            for key in list(self.cache_data):
+                self.pop(key)
+            self.restore_state(state)
+            for _ in range(count):
+                self.restore_entry(*unpickler.load())
+        self.shrink()
+
+    def victim(self):
+        """ Key the policy evicts next
+        """
+        raise NotImplementedError("victim must be implemented in your "
+                                  "cache class")
+
+    def victims(self):
+        """ Iterator over the cached keys the policy would evict, in
+        order, before any key a put_many is about to store, or None
+        when it cannot tell. Policies returning an iterator store
+        items with store.
+        """
+        return None
+
+    def store(self, key, item):
+        """ Store an item once room is made and its size accounted
+        """
+        raise NotImplementedError("store must be implemented in your "
+                                  "cache class")
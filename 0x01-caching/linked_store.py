@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+""" LinkedStore module
+"""
+
+
+class Node():
+    """ Entry of a LinkedStore, linked to its neighbours in order
+    """
+    __slots__ = ("key", "item", "prev", "next")
+
+
+class LinkedStore():
+    """ Ordered mapping kept as a dict of nodes in a circular list
+
+    Every operation does a single lookup in `nodes`, the node then
+    being relinked in place, so a cache hit that also refreshes the
+    key's position costs one hash lookup instead of the three of a
+    `key in`, `move_to_end` and `get` sequence on an OrderedDict.
+    It offers the part of the OrderedDict API the caches use.
+    """
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.nodes = {}
+        root = self.root = Node()
+        root.prev = root.next = root
+
+    def __len__(self):
+        """ Number of keys
+        """
+        return len(self.nodes)
+
+    def __contains__(self, key):
+        """ Tell if key is stored
+        """
+        return key in self.nodes
+
+    def __iter__(self):
+        """ Iterate over the keys, first to last
+        """
+        root = self.root
+        node = root.next
+        while node is not root:
+            yield node.key
+            node = node.next
+
+    def __reversed__(self):
+        """ Iterate over the keys, last to first
+        """
+        root = self.root
+        node = root.prev
+        while node is not root:
+            yield node.key
+            node = node.prev
+
+    def keys(self):
+        """ Keys, first to last
+        """
+        return iter(self)
+
+    def items(self):
+        """ (key, item) pairs, first to last
+        """
+        return ((key, self.nodes[key].item) for key in self)
+
+    def __link(self, node, last):
+        """ Insert node at the end or at the beginning of the list
+        """
+        root = self.root
+        if last:
+            before = root.prev
+            node.prev = before
+            node.next = root
+            before.next = root.prev = node
+        else:
+            after = root.next
+            node.prev = root
+            node.next = after
+            after.prev = root.next = node
+
+    def __move(self, node, last):
+        """ Unlink node and insert it at the end or at the beginning
+        """
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        self.__link(node, last)
+
+    def __getitem__(self, key):
+        """ Item of key
+        """
+        return self.nodes[key].item
+
+    def get(self, key, default=None):
+        """ Item of key, or default when key is not stored
+        """
+        node = self.nodes.get(key)
+        return default if node is None else node.item
+
+    def put(self, key, item, last=True, move=False):
+        """ Store item under key, returning True if key is new
+        A new key goes at the end, or at the beginning when last is
+        False; when move is True an existing key is moved there too.
+        """
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Node()
+            node.key = key
+            node.item = item
+            self.__link(node, last)
+            return True
+        node.item = item
+        if move:
+            self.__move(node, last)
+        return False
+
+    def __setitem__(self, key, item):
+        """ Store item under key, a new key going at the end
+        """
+        self.put(key, item)
+
+    def touch(self, key, last=True):
+        """ Move key to the end, or the beginning, and return its item
+        Return None when key is not stored.
+        """
+        node = self.nodes.get(key)
+        if node is None:
+            return None
+        self.__move(node, last)
+        return node.item
+
+    def move_to_end(self, key, last=True):
+        """ Move an existing key to the end, or the beginning
+        """
+        node = self.nodes.get(key)
+        if node is None:
+            raise KeyError(key)
+        self.__move(node, last)
+
+    def pop(self, key, *default):
+        """ Remove key and return its item, or default if given
+        """
+        node = self.nodes.pop(key, None)
+        if node is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        return node.item
+
+    def popitem(self, last=True):
+        """ Remove and return the last, or first, (key, item) pair
+        """
+        root = self.root
+        node = root.prev if last else root.next
+        if node is root:
+            raise KeyError("popitem(): store is empty")
+        self.pop(node.key)
+        return node.key, node.item
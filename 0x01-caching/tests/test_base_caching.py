@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Tests of the capacity settings and batches shared by the policies.
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+POLICIES = [
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('100-lfu_cache').LFUCache,
+    __import__('103-arc_cache').ARCCache,
+]
+BasicCache = __import__('0-basic_cache').BasicCache
+TinyLFUCache = __import__('104-tinylfu_cache').TinyLFUCache
+
+
+class TestCapacity(unittest.TestCase):
+    """A capacity no item fits in is refused when the cache is built."""
+
+    def test_no_item(self):
+        """max_items below 1 used to make the first put raise
+        StopIteration, or ValueError from min() in LFUCache."""
+        for policy in POLICIES:
+            for max_items in (0, -1):
+                with self.assertRaises(ValueError, msg=policy.__name__):
+                    policy(max_items=max_items)
+
+    def test_negative_bytes(self):
+        """max_bytes below 0 is refused, 0 is a valid budget."""
+        for policy in POLICIES:
+            with self.assertRaises(ValueError, msg=policy.__name__):
+                policy(max_bytes=-1)
+            cache = policy(max_bytes=0)
+            cache.put("a", "b")
+            self.assertEqual(len(cache.cache_data), 0)
+
+    def test_one_item(self):
+        """The smallest valid cache keeps the last item put."""
+        for policy in POLICIES:
+            cache = policy(max_items=1)
+            cache.put("a", 1)
+            cache.put("b", 2)
+            self.assertEqual(list(cache.cache_data), ["b"], policy.__name__)
+
+
+class TestBatches(unittest.TestCase):
+    """get_many and put_many do what a loop of get and put does."""
+
+    def pair(self, policy, **settings):
+        """Two caches of policy, each listing its evictions."""
+        caches = []
+        for _ in range(2):
+            cache = policy(**settings)
+            cache.evicted = []
+            cache.on_evict(lambda key, item, reason, cache=cache:
+                           cache.evicted.append((key, item, reason)))
+            caches.append(cache)
+        return caches
+
+    def check(self, policy, seed, **settings):
+        """Random batches on one cache, key by key on the other."""
+        batched, looped = self.pair(policy, **settings)
+        rng = random.Random(seed)
+        for step in range(300):
+            keys = [rng.randrange(12) for _ in range(rng.randrange(7))]
+            if rng.random() < 0.5:
+                found = {}
+                for key in keys:
+                    item = looped.get(key)
+                    if item is not None:
+                        found[key] = item
+                self.assertEqual(batched.get_many(keys), found)
+            else:
+                mapping = {key: "v" * rng.randrange(1, 9) + str(step)
+                           for key in keys}
+                if keys and rng.random() < 0.1:
+                    mapping[None] = "none"
+                    mapping[keys[0]] = None
+                batched.put_many(mapping)
+                for key, item in mapping.items():
+                    looped.put(key, item)
+            self.assertEqual(list(batched.cache_data.items()),
+                             list(looped.cache_data.items()))
+            self.assertEqual(batched.evicted, looped.evicted)
+            self.assertEqual(batched.stats.as_dict(),
+                             looped.stats.as_dict())
+            self.assertEqual(batched.cache_bytes, looped.cache_bytes)
+
+    def test_items(self):
+        """Caches bounded by an item count."""
+        for policy in POLICIES + [BasicCache, TinyLFUCache]:
+            for max_items in (1, 3, 5):
+                self.check(policy, max_items, max_items=max_items)
+
+    def test_bytes(self):
+        """Caches bounded by a byte budget, some items too big."""
+        for policy in POLICIES + [BasicCache]:
+            for max_bytes in (6, 20):
+                self.check(policy, max_bytes, max_bytes=max_bytes,
+                           sizeof=len)
+
+
+if __name__ == "__main__":
+    unittest.main()
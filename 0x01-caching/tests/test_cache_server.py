@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tests of the framing of CacheServer commands.
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+cache_server = __import__('110-cache_server')
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+class TestFraming(unittest.TestCase):
+    """Data sent with a put is never read as commands."""
+
+    def exchange(self, request, answers):
+        """Send request to a new server, read up to answers lines and
+        return them with the cache of the server."""
+        cache = LRUCache(max_items=8)
+
+        async def run():
+            """Serve one connection sending request."""
+            server = await cache_server.CacheServer(cache).start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", port)
+                writer.write(request)
+                await writer.drain()
+                lines = []
+                for _ in range(answers):
+                    line = await asyncio.wait_for(reader.readline(), 5)
+                    if not line:
+                        break
+                    lines.append(line)
+                writer.close()
+                await writer.wait_closed()
+                return lines
+
+        return asyncio.run(run()), cache
+
+    def test_oversized_put(self):
+        """An oversized put is refused, its data skipped, and the next
+        pipelined command answered."""
+        size = cache_server.MAX_VALUE + 1
+        payload = b"put evil 2\r\nxx\r\n"
+        payload += b"x" * (size - len(payload))
+        lines, cache = self.exchange(
+            b"put k %d\r\n%s\r\nget k\r\n" % (size, payload), 2)
+        self.assertEqual(lines, [b"ERROR value too large\r\n",
+                                 b"MISS\r\n"])
+        self.assertNotIn("evil", cache.cache_data)
+        self.assertNotIn("k", cache.cache_data)
+
+    def test_unreadable_size(self):
+        """A put without a size closes the connection, its data is not
+        read as commands."""
+        lines, cache = self.exchange(
+            b"put k\r\nput evil 2\r\nxx\r\nget k\r\n", 3)
+        self.assertEqual(lines, [b"ERROR usage: put <key> <n>\r\n"])
+        self.assertNotIn("evil", cache.cache_data)
+
+    def test_pipelined_put_get(self):
+        """A put and a get sent at once are answered in order."""
+        lines, cache = self.exchange(b"put k 2\r\nab\r\nget k\r\n", 3)
+        self.assertEqual(lines, [b"OK\r\n", b"VALUE 2\r\n", b"ab\r\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
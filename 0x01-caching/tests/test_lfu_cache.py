@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Tests of LFUCache snapshot and restore.
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+
+class TestRestore(unittest.TestCase):
+    """The frequencies of a snapshot decide the next victim."""
+
+    def test_min_freq(self):
+        """min_freq is that of the restored entries, not the one the
+        cache had before the restore."""
+        source = LFUCache(max_items=2)
+        source.put("a", 1)
+        source.get("a")
+        source.put("b", 2)
+        for _ in range(3):
+            source.get("b")
+        target = LFUCache(max_items=2)
+        target.put("x", 0)
+        for _ in range(3):
+            target.get("x")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lfu.snapshot")
+            source.snapshot(path)
+            target.restore(path)
+        self.assertEqual(target.min_freq, 1)
+        self.assertEqual(target.victim(), "a")
+        target.put("c", 3)
+        self.assertEqual(sorted(target.cache_data), ["b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
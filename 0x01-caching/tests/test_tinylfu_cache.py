@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Tests of TinyLFUCache at tiny capacities.
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+TinyLFUCache = __import__('104-tinylfu_cache').TinyLFUCache
+
+
+class TestTinyCapacity(unittest.TestCase):
+    """A window of one key with a main space of at most one key."""
+
+    def check_segments(self, cache):
+        """Every cached key is in exactly one segment."""
+        segments = [cache.window, cache.probation, cache.protected]
+        self.assertEqual(sum(map(len, segments)), len(cache.cache_data))
+        self.assertEqual(set().union(*segments), set(cache.cache_data))
+
+    def test_one_item(self):
+        """The second put of a one item cache used to raise
+        StopIteration, its main space being empty."""
+        cache = TinyLFUCache(max_items=1)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(len(cache.cache_data), 1)
+        self.check_segments(cache)
+
+    def test_no_item(self):
+        """A cache of no item is refused; its first put used to loop
+        forever making room."""
+        for max_items in (0, -1):
+            with self.assertRaises(ValueError):
+                TinyLFUCache(max_items=max_items)
+        with self.assertRaises(ValueError):
+            TinyLFUCache(max_bytes=1024)
+
+    def test_random_workload(self):
+        """Random puts and gets stay within max_items."""
+        for max_items in (1, 2, 3, 5):
+            cache = TinyLFUCache(max_items=max_items)
+            rng = random.Random(max_items)
+            for i in range(2000):
+                key = rng.randrange(3 * max_items + 2)
+                if rng.random() < 0.5:
+                    cache.put(key, i)
+                else:
+                    cache.get(key)
+                self.assertLessEqual(len(cache.cache_data), max_items)
+                self.check_segments(cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
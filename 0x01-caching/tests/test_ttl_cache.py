@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Tests of TimerWheel and TTLCache, on a clock set by the tests.
+"""
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+ttl_cache = __import__('102-ttl_cache')
+LRUCache = __import__('3-lru_cache').LRUCache
+TimerWheel = ttl_cache.TimerWheel
+TTLCache = ttl_cache.TTLCache
+
+
+class Clock():
+    """A clock returning the time the test sets."""
+
+    def __init__(self):
+        """Start at time 0."""
+        self.now = 0.0
+
+    def __call__(self):
+        """The current time."""
+        return self.now
+
+
+class TestTimerWheel(unittest.TestCase):
+    """Keys come out of the wheel at the tick of their deadline."""
+
+    def turn(self, wheel, deadlines, start, steps):
+        """Advance wheel tick by tick, checking each key comes out at
+        the tick of its deadline, and return the keys that did."""
+        out = set()
+        for tick in range(start + 1, start + steps + 1):
+            for key, deadline in wheel.advance(tick):
+                self.assertEqual(deadline, deadlines[key])
+                self.assertEqual(math.ceil(deadline), tick, key)
+                out.add(key)
+        return out
+
+    def test_cascade(self):
+        """Deadlines across the level 1 and level 2 boundaries of a
+        wheel of 4 slots per level, up to the end of its 64 ticks span,
+        from starts inside a level 1 or level 2 slot."""
+        for start in (0, 3, 15, 18, 45):
+            wheel = TimerWheel(1.0, bits=2, levels=3, now=start)
+            deadlines = {}
+            for delay in range(1, 64 - start):
+                deadlines[delay] = start + delay - 0.5
+                wheel.schedule(delay, deadlines[delay])
+            self.assertEqual(self.turn(wheel, deadlines, start, 64),
+                             set(deadlines), start)
+            self.assertEqual(wheel.count, 0)
+
+    def test_random(self):
+        """Random deadlines scheduled while the wheel turns, and
+        advances of more than one tick; parked deadlines are scheduled
+        again, as TTLCache.reap does."""
+        rng = random.Random(4)
+        wheel = TimerWheel(0.5, bits=2, levels=3)
+        deadlines = {}
+        now = 0.0
+        for key in range(2000):
+            deadlines[key] = now + rng.uniform(0.01, 30)
+            wheel.schedule(key, deadlines[key])
+            now += rng.uniform(0, 0.3)
+            for k, deadline in wheel.advance(now):
+                self.assertEqual(deadline, deadlines[k])
+                if deadline > now:
+                    wheel.schedule(k, deadline)
+                    continue
+                self.assertGreater(deadline, now - 0.5 - 0.3)
+                del deadlines[k]
+        while deadlines:
+            now += 0.5
+            for k, deadline in wheel.advance(now):
+                if deadline > now:
+                    wheel.schedule(k, deadline)
+                else:
+                    self.assertEqual(deadline, deadlines.pop(k))
+        self.assertEqual(wheel.count, 0)
+
+    def test_parked(self):
+        """A deadline beyond the span of the wheel is placed again as
+        the top level turns, and comes out at its tick."""
+        wheel = TimerWheel(1.0, bits=2, levels=2)
+        wheel.schedule("far", 100)
+        deadlines = {"far": 100}
+        self.assertEqual(self.turn(wheel, deadlines, 0, 120), {"far"})
+
+    def test_parked_single_level(self):
+        """With a single level, a deadline beyond its span comes out
+        early, still in the future."""
+        wheel = TimerWheel(1.0, bits=2, levels=1)
+        wheel.schedule("far", 100)
+        due = []
+        tick = 0
+        while not due:
+            tick += 1
+            due = wheel.advance(tick)
+        self.assertEqual(due, [("far", 100)])
+        self.assertLessEqual(tick, 4)
+
+    def test_rescheduled_at_span_end(self):
+        """A deadline scheduled again on the last tick of the span of
+        the top level comes out at its tick, not a turn later."""
+        wheel = TimerWheel(1.0, bits=2, levels=3)
+        wheel.advance(63)
+        wheel.schedule("next", 63.5)
+        self.assertEqual(self.turn(wheel, {"next": 63.5}, 63, 8),
+                         {"next"})
+
+
+class TestTTLCache(unittest.TestCase):
+    """Entries expire at their exact deadline."""
+
+    def setUp(self):
+        """An LRU cache of 2 items with a 10 second wheel."""
+        self.clock = Clock()
+        self.lru = LRUCache(max_items=2)
+        self.cache = TTLCache(self.lru, resolution=10.0, clock=self.clock)
+
+    def test_lazy_expiry(self):
+        """get drops an expired entry before the wheel ticks."""
+        self.cache.put("a", 1, ttl=3)
+        self.clock.now = 2.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 3.5
+        self.assertIsNone(self.cache.get("a"))
+        self.assertNotIn("a", self.lru.cache_data)
+        self.assertEqual(self.lru.stats.expirations, 1)
+
+    def test_reap(self):
+        """reap removes the entries of the ticks reached, only."""
+        self.cache.put("a", 1, ttl=5)
+        self.cache.put("b", 2, ttl=25)
+        self.clock.now = 12
+        self.assertEqual(self.cache.reap(), 1)
+        self.assertEqual(list(self.lru.cache_data), ["b"])
+        self.clock.now = 30
+        self.assertEqual(self.cache.reap(), 1)
+        self.assertEqual(len(self.lru.cache_data), 0)
+
+    def test_rescheduled(self):
+        """An entry coming out of the wheel before its deadline is
+        scheduled again by reap, and expires at its deadline."""
+        self.cache.wheel = TimerWheel(1.0, bits=2, levels=1)
+        self.cache.put("far", 1, ttl=100)
+        for now in range(1, 100):
+            self.clock.now = now
+            self.assertEqual(self.cache.reap(), 0, now)
+        self.assertIn("far", self.lru.cache_data)
+        self.clock.now = 100
+        self.assertEqual(self.cache.reap(), 1)
+        self.assertNotIn("far", self.lru.cache_data)
+
+    def test_evicted(self):
+        """A key evicted by the LRU policy loses its deadline, which
+        then does not expire the key put again without one."""
+        self.cache.put("a", 1, ttl=5)
+        self.cache.put("b", 2)
+        self.cache.put("c", 3)
+        self.assertNotIn("a", self.cache.expires)
+        self.cache.put("a", 4)
+        self.clock.now = 20
+        self.assertEqual(self.cache.reap(), 0)
+        self.assertEqual(self.cache.get("a"), 4)
+
+    def test_not_stored(self):
+        """An item the policy does not store gets no deadline."""
+        cache = TTLCache(LRUCache(max_bytes=10), ttl=5, clock=self.clock)
+        cache.put("big", "x" * 100)
+        self.assertEqual(cache.expires, {})
+        self.assertEqual(cache.wheel.count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()